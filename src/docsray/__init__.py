@@ -3,6 +3,14 @@
 __version__ = "0.6.0"
 __author__ = "Docsray Team"
 
-from .server import DocsrayServer
-
 __all__ = ["DocsrayServer"]
+
+
+def __getattr__(name):
+    # Imported lazily so worker processes that only need a utility module
+    # do not pay for loading the server and its MCP dependencies
+    if name == "DocsrayServer":
+        from .server import DocsrayServer
+
+        return DocsrayServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
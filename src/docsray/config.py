@@ -54,6 +54,52 @@ class MistralOCRConfig(BaseModel):
     api_key: Optional[str] = Field(default=None)
     base_url: str = Field(default="https://api.mistral.ai")
     model: str = Field(default="pixtral-12b-2409")
+    response_cache: bool = Field(
+        default=True, description="Cache responses for identical requests"
+    )
+    semantic_cache: bool = Field(
+        default=False,
+        description="Also reuse responses for near-duplicate content (embedding match)",
+    )
+    semantic_cache_threshold: float = Field(default=0.95, ge=0.0, le=1.0)
+    embedding_model: str = Field(default="mistral-embed")
+    max_retries: int = Field(
+        default=5, ge=0, description="Retries for rate-limited or failed requests"
+    )
+    max_concurrency: int = Field(
+        default=8, ge=1, description="Maximum concurrent Mistral API requests"
+    )
+    requests_per_minute: Optional[int] = Field(
+        default=None, ge=1, description="Client-side request rate limit"
+    )
+    tokens_per_minute: Optional[int] = Field(
+        default=None, ge=1, description="Client-side token rate limit"
+    )
+    pdf_markdown: bool = Field(
+        default=False,
+        description="Extract PDF text as Markdown (pymupdf4llm) to keep structure",
+    )
+    coalesce_window_ms: int = Field(
+        default=0,
+        ge=0,
+        description="Merge small concurrent summary requests arriving within this "
+        "window into one API call (0 disables)",
+    )
+    summary_chunk_tokens: int = Field(
+        default=6000,
+        ge=1,
+        description="Input token budget per summarization request",
+    )
+    pdf_workers: int = Field(
+        default=4,
+        ge=1,
+        description="Worker processes for per-page text extraction of large PDFs",
+    )
+    tool_calling: bool = Field(
+        default=False,
+        description="Return classification/extraction results via function calls "
+        "instead of JSON mode",
+    )
 
 
 class LlamaParseConfig(BaseModel):
@@ -223,6 +269,46 @@ class DocsrayConfig(BaseModel):
                     "base_url": os.getenv(
                         "DOCSRAY_MISTRAL_BASE_URL", "https://api.mistral.ai"
                     ),
+                    "response_cache": os.getenv(
+                        "DOCSRAY_MISTRAL_RESPONSE_CACHE", "true"
+                    ).lower()
+                    == "true",
+                    "semantic_cache": os.getenv(
+                        "DOCSRAY_MISTRAL_SEMANTIC_CACHE", "false"
+                    ).lower()
+                    == "true",
+                    "semantic_cache_threshold": float(
+                        os.getenv("DOCSRAY_MISTRAL_SEMANTIC_THRESHOLD", "0.95")
+                    ),
+                    "max_retries": int(os.getenv("DOCSRAY_MISTRAL_MAX_RETRIES", "5")),
+                    "max_concurrency": int(
+                        os.getenv("DOCSRAY_MISTRAL_MAX_CONCURRENCY", "8")
+                    ),
+                    "requests_per_minute": (
+                        int(os.getenv("DOCSRAY_MISTRAL_RPM"))
+                        if os.getenv("DOCSRAY_MISTRAL_RPM")
+                        else None
+                    ),
+                    "tokens_per_minute": (
+                        int(os.getenv("DOCSRAY_MISTRAL_TPM"))
+                        if os.getenv("DOCSRAY_MISTRAL_TPM")
+                        else None
+                    ),
+                    "pdf_markdown": os.getenv(
+                        "DOCSRAY_MISTRAL_PDF_MARKDOWN", "false"
+                    ).lower()
+                    == "true",
+                    "pdf_workers": int(os.getenv("DOCSRAY_MISTRAL_PDF_WORKERS", "4")),
+                    "summary_chunk_tokens": int(
+                        os.getenv("DOCSRAY_MISTRAL_SUMMARY_CHUNK_TOKENS", "6000")
+                    ),
+                    "coalesce_window_ms": int(
+                        os.getenv("DOCSRAY_MISTRAL_COALESCE_MS", "0")
+                    ),
+                    "tool_calling": os.getenv(
+                        "DOCSRAY_MISTRAL_TOOL_CALLING", "false"
+                    ).lower()
+                    == "true",
                 },
                 "llama_parse": {
                     "enabled": os.getenv("DOCSRAY_LLAMAPARSE_ENABLED", "false").lower()
@@ -1,17 +1,72 @@
 """Mistral AI provider for document intelligence tasks."""
 
+import asyncio
+import contextlib
+import functools
+import io
 import json
 import logging
+import random
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from pathlib import Path
-from typing import Any, Optional
+from typing import Annotated, Any, Optional, Union
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import pymupdf4llm
+except ImportError:
+    pymupdf4llm = None
+
+try:
+    from mistral_common.tokens.tokenizers.mistral import MistralTokenizer
+except ImportError:
+    MistralTokenizer = None
+
+try:
+    from mistralai import Mistral
+    from mistralai.models import ChatCompletionResponse, SystemMessage, UserMessage
+except ImportError:
+    Mistral = None
+    ChatCompletionResponse = SystemMessage = UserMessage = None
 
 from ..config import MistralOCRConfig
+from ..utils.coalescer import RequestCoalescer
 from ..utils.documents import (
+    calculate_file_hash,
     download_document,
     get_document_format,
     get_local_document,
     is_url,
 )
+from ..utils.pdf_pages import close_documents, shutdown_pools
+from ..utils.rate_limiter import RateLimiter
+from ..utils.semantic_cache import SemanticCache
+from ..utils.text_cache import ExtractedTextCache
 from .base import (
     Document,
     DocumentProvider,
@@ -25,6 +80,704 @@ from .base import (
 
 logger = logging.getLogger(__name__)
 
+# Content longer than this is not embedded for semantic cache lookups: a
+# truncated embedding could match documents that only differ further on.
+_MAX_EMBED_CHARS = 16000
+
+# Content shorter than this (after stripping) is not worth an API call
+_MIN_CONTENT_CHARS = 32
+
+# Rate limiting and transient server errors are worth retrying
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRY_DELAY = 60.0
+
+# Shared connection pool for all API calls. Idle connections are kept long
+# enough to survive short rate-limit pauses between bursts.
+_HTTP_MIN_CONNECTIONS = 32
+_HTTP_KEEPALIVE_EXPIRY = 30.0
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Input budget per classification/extraction request. Longer documents are
+# split into several requests that run concurrently.
+_MAX_INPUT_TOKENS = 6000
+_CHARS_PER_TOKEN = 4
+_PAGE_TOKEN_OVERHEAD = 16
+
+# Generous upper bound on characters per token, used to pre-cut very long
+# text so only its head is tokenized
+_MAX_CHARS_PER_TOKEN = 16
+_TRUNCATION_MARKER = "\n\n[Content truncated...]"
+
+# Batch API jobs: endpoint used for every request, and statuses after which
+# a job will not make further progress
+_BATCH_ENDPOINT = "/v1/chat/completions"
+_BATCH_DONE_STATUSES = frozenset({"SUCCESS", "FAILED", "TIMEOUT_EXCEEDED", "CANCELLED"})
+
+# Bump when _extract_pdf_text output changes so stale cached text is ignored
+_TEXT_EXTRACTOR_VERSION = "2"
+
+# Pages per request when small summary requests are coalesced
+_COALESCED_BATCH_SIZE = 8
+
+# Resolved paths and file hashes remembered per provider (least recently
+# used entries are dropped first)
+_MAX_TRACKED_DOCUMENTS = 256
+
+# File suffixes _extract_text reads locally
+_PDF_SUFFIXES = frozenset({".pdf"})
+_PLAIN_TEXT_SUFFIXES = frozenset({".txt", ".md"})
+
+# Keys every classification item / extracted field must carry
+_CLASSIFICATION_KEYS = frozenset({"page", "label", "confidence"})
+_EXTRACTION_KEYS = frozenset({"name", "value", "confidence"})
+
+
+def _http_limits(max_concurrency: int) -> httpx.Limits:
+    """Pool limits keeping one warm connection per concurrent request slot."""
+    size = max(max_concurrency, _HTTP_MIN_CONNECTIONS)
+    return httpx.Limits(
+        max_connections=2 * size,
+        max_keepalive_connections=size,
+        keepalive_expiry=_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize request payloads to JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def _pack_pages(pages: list[dict[str, Any]]) -> str:
+    """Serialize pages as compact ``[page, text]`` rows for a prompt.
+
+    Rows drop the "page"/"text" keys repeated in every dict, which is a
+    sizeable share of the tokens for short classification samples, while
+    keeping each page number next to its text.
+    """
+    return _dumps(
+        [
+            [page.get("page"), page.get("text") or page.get("textSample") or ""]
+            for page in pages
+        ]
+    )
+
+
+def _loads(text: Union[str, bytes]) -> Any:
+    """Parse a JSON response (str or UTF-8 bytes), using orjson when available.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    handle both parsers' errors the same way.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _response_json(response: Any, tool_name: Optional[str] = None) -> Any:
+    """Parse the JSON body of a JSON-mode chat completion.
+
+    With ``tool_name`` set, parse the arguments of that forced function call
+    instead of the message content.
+
+    Raises:
+        ValueError: If the response is empty or not valid JSON
+    """
+    if not response.choices:
+        raise ValueError("Mistral API returned empty response (no choices)")
+
+    message = response.choices[0].message
+    if tool_name is not None:
+        for call in message.tool_calls or []:
+            if call.function.name == tool_name:
+                arguments = call.function.arguments
+                return _loads(arguments) if isinstance(arguments, str) else arguments
+        raise ValueError(f"Mistral API response has no {tool_name} call")
+
+    result_text = (message.content or "").strip()
+    if not result_text:
+        raise ValueError("Mistral API returned empty content in response")
+
+    try:
+        return _loads(result_text)
+    except json.JSONDecodeError as e:
+        logger.debug(f"Unparseable response text: {result_text[:500]}")
+        raise ValueError(f"Failed to parse Mistral response as JSON: {e}") from e
+
+
+def _batch_response(entry: dict[str, Any]) -> Any:
+    """Turn one Batch API output line into a chat completion response.
+
+    Raises:
+        ValueError: If the request failed or the body is not a completion
+    """
+    if entry.get("error"):
+        raise ValueError(f"Batch request failed: {entry['error']}")
+
+    response = entry.get("response") or {}
+    if response.get("status_code", 200) != 200:
+        raise ValueError(f"Batch request returned HTTP {response['status_code']}")
+    return ChatCompletionResponse.model_validate(response.get("body") or {})
+
+
+def _estimate_request_tokens(request: dict[str, Any]) -> int:
+    """Rough prompt + completion token cost of a chat request."""
+    prompt = sum(
+        _estimate_tokens(str(getattr(message, "content", "") or ""))
+        for message in request.get("messages", [])
+    )
+    return prompt + (request.get("max_tokens") or 0)
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Return seconds to wait before retrying ``error``, or None to give up.
+
+    Honors the server's Retry-After header when present and otherwise
+    backs off exponentially (1s, 2s, 4s, ...) with jitter.
+    """
+    if not isinstance(error, httpx.TransportError):
+        if getattr(error, "status_code", None) not in _RETRYABLE_STATUS_CODES:
+            return None
+
+        raw_response = getattr(error, "raw_response", None)
+        retry_after = raw_response.headers.get("retry-after") if raw_response else None
+        if retry_after:
+            try:
+                return min(float(retry_after), _MAX_RETRY_DELAY)
+            except ValueError:
+                pass
+
+    return min(2.0**attempt + random.uniform(0, 1), _MAX_RETRY_DELAY)
+
+
+def _file_size(path: Path, default: Optional[int] = None) -> Optional[int]:
+    """Size of a file in bytes with a single stat, or ``default`` if missing."""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return default
+
+
+def _extract_pdf_text(doc_path: Path, markdown: bool = False) -> str:
+    """Extract plain text from every page of a PDF (blocking).
+
+    PyMuPDF documents are not thread-safe, so pages are read sequentially
+    from a single handle; callers run this in a worker thread. Ligatures are
+    expanded to plain letters and blocks are kept in content-stream order
+    (no sorting pass), which is all an LLM prompt needs.
+
+    With ``markdown`` set (and pymupdf4llm installed), the text is instead
+    rendered as Markdown with headings and tables preserved; this is slower
+    but gives the model the document's structure.
+    """
+    if markdown and pymupdf4llm is not None:
+        return pymupdf4llm.to_markdown(str(doc_path))
+
+    if fitz is None:
+        raise ImportError("PyMuPDF not installed. Install with: pip install pymupdf")
+
+    flags = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES
+    # Write pages straight into one buffer rather than collecting them all
+    # for str.join, so peak memory stays near the size of the final text
+    buffer = io.StringIO()
+    with fitz.open(str(doc_path)) as pdf:
+        for i in range(pdf.page_count):
+            if i:
+                buffer.write("\n\n")
+            buffer.write(pdf.load_page(i).get_text("text", flags=flags, sort=False))
+    return buffer.getvalue()
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for Mistral tokenizers)."""
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+@functools.lru_cache(maxsize=1)
+def _tokenizer() -> Any:
+    """Load Mistral's tokenizer once; None when mistral-common is missing."""
+    if MistralTokenizer is None:
+        return None
+    return MistralTokenizer.v3().instruct_tokenizer.tokenizer
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens, marking the cut.
+
+    Counts real tokens with mistral-common when installed and otherwise
+    falls back to the ~4 characters per token estimate.
+    """
+    tokenizer = _tokenizer()
+    if tokenizer is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        return text if len(text) <= max_chars else text[:max_chars] + _TRUNCATION_MARKER
+
+    head = text[: max_tokens * _MAX_CHARS_PER_TOKEN]
+    ids = tokenizer.encode(head, bos=False, eos=False)
+    if len(ids) <= max_tokens and len(head) == len(text):
+        return text
+    return tokenizer.decode(ids[:max_tokens]) + _TRUNCATION_MARKER
+
+
+def _chunk_pages_by_tokens(
+    pages: list[dict[str, Any]], max_tokens: int = _MAX_INPUT_TOKENS
+) -> list[list[dict[str, Any]]]:
+    """Greedily pack consecutive pages into chunks of at most ``max_tokens``.
+
+    Page order is preserved. A single page larger than the budget gets a
+    chunk of its own rather than being split.
+    """
+    chunks: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    current_tokens = 0
+
+    for page in pages:
+        text = page.get("text") or page.get("textSample") or ""
+        tokens = _estimate_tokens(text) + _PAGE_TOKEN_OVERHEAD
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(page)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _remember(mapping: OrderedDict, key: Any, value: Any) -> None:
+    """Store ``key`` as most recently used, dropping the oldest past the cap."""
+    mapping[key] = value
+    mapping.move_to_end(key)
+    while len(mapping) > _MAX_TRACKED_DOCUMENTS:
+        mapping.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=64)
+def _allowed_labels(labels: tuple[str, ...]) -> frozenset:
+    """Labels a classification may use, built once per label set."""
+    return frozenset(labels) | {"other"}
+
+
+def _is_valid_classification(item: Any, label_set: frozenset) -> bool:
+    """Whether a classification item is well-formed with an allowed label."""
+    return (
+        isinstance(item, dict)
+        and item.keys() >= _CLASSIFICATION_KEYS
+        and isinstance(item["label"], str)
+        and item["label"] in label_set
+        and isinstance(item["confidence"], (int, float))
+        and 0.0 <= item["confidence"] <= 1.0
+    )
+
+
+if msgspec is not None:
+
+    class _ClassificationItem(msgspec.Struct):
+        page: int
+        label: str
+        confidence: Annotated[float, msgspec.Meta(ge=0.0, le=1.0)]
+
+    class _ClassificationResponse(msgspec.Struct):
+        labels: list[_ClassificationItem]
+
+    _decode_classification = msgspec.json.Decoder(_ClassificationResponse).decode
+
+    class _ExtractedField(msgspec.Struct):
+        name: str
+        value: Any
+        confidence: Annotated[float, msgspec.Meta(ge=0.0, le=1.0)]
+        source: Any = msgspec.UNSET
+
+    class _ExtractionResponse(msgspec.Struct):
+        fields: list[_ExtractedField]
+        errors: list[Any] = []
+
+    _decode_extraction = msgspec.json.Decoder(_ExtractionResponse).decode
+else:
+    _decode_classification = None
+    _decode_extraction = None
+
+
+def _response_text(response: Any, tool_name: Optional[str] = None) -> Optional[str]:
+    """Raw JSON text of a completion's content or forced tool call, if any."""
+    if not response.choices:
+        return None
+    message = response.choices[0].message
+    if tool_name is None:
+        text = message.content
+    else:
+        text = next(
+            (
+                call.function.arguments
+                for call in message.tool_calls or []
+                if call.function.name == tool_name
+            ),
+            None,
+        )
+    return text if isinstance(text, str) else None
+
+
+def _fast_classification(
+    response: Any, label_set: frozenset, tool_name: Optional[str] = None
+) -> Optional[list[dict[str, Any]]]:
+    """Decode and validate a classification response in one pass.
+
+    Uses msgspec's typed decoder when it is installed, on the message
+    content or, with ``tool_name`` set, on that function call's arguments.
+    Returns None when msgspec is missing, or when the payload does not
+    strictly match the expected shape, so callers can fall back to the
+    lenient per-item validation.
+    """
+    if _decode_classification is None:
+        return None
+    content = _response_text(response, tool_name)
+    if content is None:
+        return None
+
+    try:
+        decoded = _decode_classification(content)
+    except msgspec.DecodeError:  # Also raised for validation errors
+        return None
+    return [
+        msgspec.structs.asdict(item)
+        for item in decoded.labels
+        if item.label in label_set
+    ]
+
+
+def _fast_extraction(
+    response: Any, tool_name: Optional[str] = None
+) -> Optional[dict[str, Any]]:
+    """Decode and validate an extraction response in one pass.
+
+    Like _fast_classification, returns None when msgspec is missing or the
+    payload does not strictly match, leaving the lenient path to handle it.
+    """
+    if _decode_extraction is None:
+        return None
+    content = _response_text(response, tool_name)
+    if content is None:
+        return None
+
+    try:
+        decoded = _decode_extraction(content)
+    except msgspec.DecodeError:
+        return None
+    fields = [
+        {
+            key: value
+            for key, value in msgspec.structs.asdict(field).items()
+            if value is not msgspec.UNSET
+        }
+        for field in decoded.fields
+    ]
+    return {"fields": fields, "errors": decoded.errors}
+
+
+class _JSONArrayStream:
+    """Incrementally decode the items of a JSON array stored under ``key``.
+
+    Text is fed as it arrives; each call returns the array items that have
+    been fully received since the previous call.
+    """
+
+    def __init__(self, key: str):
+        self._marker = f'"{key}"'
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self._done = False
+
+    def feed(self, text: str) -> list[Any]:
+        self._buffer += text
+        if self._pos is None:
+            start = self._buffer.find(self._marker)
+            bracket = self._buffer.find("[", start) if start >= 0 else -1
+            if bracket < 0:
+                return []
+            self._pos = bracket + 1
+
+        items = []
+        while not self._done:
+            pos = self._pos
+            while pos < len(self._buffer) and self._buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(self._buffer):
+                break
+            if self._buffer[pos] == "]":
+                self._done = True
+                break
+            try:
+                item, self._pos = self._decoder.raw_decode(self._buffer, pos)
+            except json.JSONDecodeError:
+                break  # Item not complete yet
+            items.append(item)
+        return items
+
+
+def _merge_extraction_results(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine per-chunk extraction results into one.
+
+    Each field keeps the first non-null value found, replaced only by a
+    later value with higher confidence.
+    """
+    best: dict[str, dict[str, Any]] = {}
+    errors: list[str] = []
+
+    for result in results:
+        errors.extend(result.get("errors", []))
+        for field in result.get("fields", []):
+            current = best.get(field["name"])
+            if (
+                current is None
+                or (current.get("value") is None and field.get("value") is not None)
+                or (
+                    field.get("value") is not None
+                    and field.get("confidence", 0) > current.get("confidence", 0)
+                )
+            ):
+                best[field["name"]] = field
+
+    merged: dict[str, Any] = {"fields": list(best.values())}
+    if errors:
+        merged["errors"] = errors
+    return merged
+
+
+@functools.lru_cache(maxsize=64)
+def _classification_prompt(labels: tuple[str, ...]) -> str:
+    """Build the page classification system prompt (memoized per label set)."""
+    return f"""You are analyzing a company's annual report. Below is a JSON \
+array of [page number, text sample] pairs. Classify each page into one of \
+these categories: {', '.join(labels)}.
+
+IMPORTANT: You MUST return a JSON object with a "labels" array containing \
+the classification results.
+
+Return JSON object with this exact format: \
+{{"labels": [{{"page": int, "label": string, "confidence": float}}]}}.
+
+Rules:
+- Do not include EBITDA reconciliation pages under income_statement
+- Multi-page sections should have same label across consecutive pages
+- Use 'other' for unclassifiable pages
+- Confidence must be between 0.0 and 1.0
+- Return ONLY the JSON object, no other text"""
+
+
+def _freeze_schema(schema: dict[str, Any]) -> str:
+    """Canonical (key-sorted) JSON for a schema, usable as a cache key."""
+    if orjson is not None:
+        return orjson.dumps(schema, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+    return json.dumps(schema, sort_keys=True)
+
+
+@functools.lru_cache(maxsize=64)
+def _structured_prompt(schema_json: str) -> str:
+    """Build the free-form structured extraction system prompt."""
+    return f"""Extract structured data from the following document.
+Return a JSON object with the requested fields: {schema_json}"""
+
+
+_FIELD_LINE = "- {name} (type: {type}, pattern: {pattern})".format
+
+
+def _describe_fields(schema_json: str) -> str:
+    """One bullet line per schema field for extraction prompts."""
+    return "\n".join(
+        _FIELD_LINE(name=f["name"], type=f["type"], pattern=f.get("pattern", "any"))
+        for f in _loads(schema_json).get("fields", [])
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _extraction_prompt(schema_json: str) -> str:
+    """Build the field extraction system prompt.
+
+    Takes the schema as canonical (key-sorted) JSON so it can be memoized.
+    """
+    return f"""Extract the following fields from financial statement text, \
+given as a JSON array of [page number, page text] pairs:
+{_describe_fields(schema_json)}
+
+IMPORTANT: You MUST return ONLY a valid JSON object, with no additional \
+text or explanation.
+
+Return JSON object with this exact format: {{"fields": [{{"name": string, \
+"value": typed_value, "confidence": float, "source": {{"page": int, \
+"lineIdx": int?}}}}], "errors": []}}.
+
+Rules:
+- Return null for missing fields
+- Include confidence score (0.0-1.0)
+- Preserve data types (numbers as numbers, dates as ISO strings)
+- Extract source page and line index when possible
+- Return ONLY the JSON object, no other text"""
+
+
+@functools.lru_cache(maxsize=64)
+def _analysis_prompt(labels: tuple[str, ...], schema_json: str) -> str:
+    """Build the combined classification + extraction system prompt."""
+    return f"""You are analyzing a company's annual report. Below is a JSON \
+array of [page number, page text] pairs. Do two tasks in one pass.
+
+1. Classify each page into one of these categories: {', '.join(labels)}.
+2. Extract the following fields from the pages:
+{_describe_fields(schema_json)}
+
+IMPORTANT: You MUST return ONLY a valid JSON object, with no additional \
+text or explanation.
+
+Return JSON object with this exact format: \
+{{"labels": [{{"page": int, "label": string, "confidence": float}}], \
+"fields": [{{"name": string, "value": typed_value, "confidence": float, \
+"source": {{"page": int, "lineIdx": int?}}}}], "errors": []}}.
+
+Rules:
+- Do not include EBITDA reconciliation pages under income_statement
+- Multi-page sections should have same label across consecutive pages
+- Use 'other' for unclassifiable pages
+- Return null for missing fields
+- Confidence must be between 0.0 and 1.0
+- Preserve data types (numbers as numbers, dates as ISO strings)
+- Return ONLY the JSON object, no other text"""
+
+
+_SUMMARY_STYLES = {
+    "bullet": "Create a concise bullet-point summary (3-5 points).",
+    "paragraph": "Write a single paragraph summary (3-4 sentences).",
+    "executive": "Provide an executive summary highlighting key insights.",
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _summary_prompt(style: str) -> str:
+    """Build the summarization system prompt for a summary style."""
+    return f"""Summarize the following page content.
+{_SUMMARY_STYLES.get(style, _SUMMARY_STYLES['bullet'])}
+
+Focus on factual information and key data points. Avoid speculation."""
+
+
+@functools.lru_cache(maxsize=64)
+def _batch_summary_prompt(style: str) -> str:
+    """Build the system prompt for summarizing several pages in one request."""
+    return f"""Below is a JSON array of [page number, page text] pairs. \
+Summarize each page on its own.
+{_SUMMARY_STYLES.get(style, _SUMMARY_STYLES['bullet'])}
+
+Focus on factual information and key data points. Avoid speculation.
+
+Return JSON object with this exact format: \
+{{"summaries": [{{"page": int, "summary": string}}]}}, with one entry per \
+input page. Return ONLY the JSON object, no other text."""
+
+
+@functools.lru_cache(maxsize=64)
+def _merge_summary_prompt(style: str) -> str:
+    """Build the system prompt for merging page summaries into one."""
+    return f"""Below are summaries of consecutive parts of one document, \
+in order. Combine them into a single summary of the whole document.
+{_SUMMARY_STYLES.get(style, _SUMMARY_STYLES['bullet'])}
+
+Keep the most important facts and figures. Do not add information that is \
+not in the summaries."""
+
+
+@functools.lru_cache(maxsize=64)
+def _classification_tool(labels: tuple[str, ...]) -> dict[str, Any]:
+    """Function definition the model calls with page labels."""
+    return {
+        "type": "function",
+        "function": {
+            "name": "label_pages",
+            "description": "Record the classification of each page",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "labels": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "page": {"type": "integer"},
+                                "label": {
+                                    "type": "string",
+                                    "enum": [*labels, "other"],
+                                },
+                                "confidence": {
+                                    "type": "number",
+                                    "minimum": 0.0,
+                                    "maximum": 1.0,
+                                },
+                            },
+                            "required": ["page", "label", "confidence"],
+                        },
+                    }
+                },
+                "required": ["labels"],
+            },
+        },
+    }
+
+
+@functools.lru_cache(maxsize=64)
+def _extraction_tool(schema_json: str) -> dict[str, Any]:
+    """Function definition the model calls with extracted fields."""
+    names = [f["name"] for f in _loads(schema_json).get("fields", [])]
+    return {
+        "type": "function",
+        "function": {
+            "name": "emit_fields",
+            "description": "Record the extracted field values",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "fields": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "name": {"type": "string", "enum": names},
+                                "value": {},
+                                "confidence": {
+                                    "type": "number",
+                                    "minimum": 0.0,
+                                    "maximum": 1.0,
+                                },
+                                "source": {
+                                    "type": "object",
+                                    "properties": {
+                                        "page": {"type": "integer"},
+                                        "lineIdx": {"type": "integer"},
+                                    },
+                                },
+                            },
+                            "required": ["name", "value", "confidence"],
+                        },
+                    },
+                    "errors": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["fields"],
+            },
+        },
+    }
+
+
+def _output_params(tool: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """Request parameters forcing either JSON mode or a call to ``tool``."""
+    if tool is None:
+        return {"response_format": {"type": "json_object"}}
+    return {
+        "tools": [tool],
+        "tool_choice": {
+            "type": "function",
+            "function": {"name": tool["function"]["name"]},
+        },
+    }
+
 
 class MistralProvider(DocumentProvider):
     """Mistral AI provider for document intelligence and analysis.
@@ -40,6 +793,33 @@ class MistralProvider(DocumentProvider):
         self.config: Optional[MistralOCRConfig] = None
         self._initialized = False
         self._client = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._response_cache: Optional[SemanticCache] = None
+        self._request_semaphore: Optional[asyncio.Semaphore] = None
+        # Saturation of the max_concurrency request slots
+        self.request_stats = {
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "waiting": 0,
+            "saturated": 0,
+        }
+        self._summary_coalescer: Optional[RequestCoalescer] = None
+        self._rate_limiter = RateLimiter()
+        self._text_cache = ExtractedTextCache(version=_TEXT_EXTRACTOR_VERSION)
+        # Resolved local paths per document URL, downloads in progress, and
+        # file hashes keyed by path and validated against (mtime_ns, size)
+        self._local_paths: OrderedDict[str, Path] = OrderedDict()
+        self._local_path_downloads: dict[str, asyncio.Future] = {}
+        self._file_hashes: OrderedDict[Path, tuple[int, int, str]] = OrderedDict()
+        # _file_hash runs in worker threads
+        self._file_hashes_lock = threading.Lock()
+        # Formats sniffed from document URLs. Document is an unhashable
+        # dataclass, so the memo is keyed by URL rather than by document.
+        self._formats: OrderedDict[str, Optional[str]] = OrderedDict()
+        # Capabilities are static; build them once for can_process
+        self._capabilities = self._build_capabilities()
+        self._supported_formats = frozenset(self._capabilities.formats)
+        self._max_file_size = self._capabilities.performance["maxFileSize"]
 
     def get_name(self) -> str:
         return "mistral-ocr"
@@ -48,6 +828,9 @@ class MistralProvider(DocumentProvider):
         return ["pdf", "txt", "md", "docx", "html"]
 
     def get_capabilities(self) -> ProviderCapabilities:
+        return self._capabilities
+
+    def _build_capabilities(self) -> ProviderCapabilities:
         return ProviderCapabilities(
             formats=self.get_supported_formats(),
             features={
@@ -56,7 +839,7 @@ class MistralProvider(DocumentProvider):
                 "images": True,
                 "forms": True,
                 "multiLanguage": True,
-                "streaming": False,
+                "streaming": True,
                 "customInstructions": True,
                 "semanticSearch": True,
                 "classification": True,
@@ -75,17 +858,12 @@ class MistralProvider(DocumentProvider):
             return False
 
         # Check format
-        doc_format = document.format or get_document_format(document.url)
-        if doc_format and doc_format.lower() not in self.get_supported_formats():
+        doc_format = self._cached_format(document)
+        if doc_format and doc_format.lower() not in self._supported_formats:
             return False
 
         # Check size limit
-        if document.size:
-            max_size = self.get_capabilities().performance["maxFileSize"]
-            if document.size > max_size:
-                return False
-
-        return True
+        return not (document.size and document.size > self._max_file_size)
 
     async def initialize(self, config: MistralOCRConfig) -> None:
         """Initialize Mistral provider with configuration."""
@@ -101,24 +879,70 @@ class MistralProvider(DocumentProvider):
             self._initialized = False
             return
 
-        try:
-            from mistralai import Mistral
-
-            self._client = Mistral(api_key=config.api_key, server_url=config.base_url)
-            self._initialized = True
-            logger.info(f"Mistral provider initialized with model: {config.model}")
-        except ImportError:
+        if Mistral is None:
             logger.error(
                 "mistralai package not installed. Install with: pip install mistralai"
             )
             self._initialized = False
+            return
+
+        try:
+            # Keep-alive pool (HTTP/2 when h2 is installed) reused by every
+            # request, so concurrent bursts skip repeated TCP/TLS handshakes
+            self._http_client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                limits=_http_limits(config.max_concurrency),
+                timeout=_HTTP_TIMEOUT,
+            )
+            self._client = Mistral(
+                api_key=config.api_key,
+                server_url=config.base_url,
+                async_client=self._http_client,
+            )
+            # Markdown and plain-text extractions must not share cache entries
+            self._text_cache = ExtractedTextCache(
+                version=_TEXT_EXTRACTOR_VERSION + ("-md" if config.pdf_markdown else "")
+            )
+            if config.coalesce_window_ms:
+                self._summary_coalescer = RequestCoalescer(
+                    self._summarize_coalesced,
+                    window=config.coalesce_window_ms / 1000,
+                    max_batch_size=_COALESCED_BATCH_SIZE,
+                )
+            self._rate_limiter = RateLimiter(
+                requests_per_minute=config.requests_per_minute,
+                tokens_per_minute=config.tokens_per_minute,
+            )
+            self._response_cache = (
+                SemanticCache(threshold=config.semantic_cache_threshold)
+                if config.response_cache
+                else None
+            )
+            self._initialized = True
+            logger.info(f"Mistral provider initialized with model: {config.model}")
         except Exception as e:
             logger.error(f"Failed to initialize Mistral client: {e}")
             self._initialized = False
 
     async def dispose(self) -> None:
         """Cleanup provider resources."""
+        if self._response_cache is not None:
+            self._response_cache.clear()
+        self._local_paths.clear()
+        self._local_path_downloads.clear()
+        self._file_hashes.clear()
+        self._formats.clear()
+        self._response_cache = None
+        self._request_semaphore = None
+        self._summary_coalescer = None
         self._client = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        # Shared PDF handles keep downloaded files open (and locked on Windows),
+        # and parallel page reads keep their worker processes alive
+        await asyncio.to_thread(close_documents)
+        shutdown_pools()
         self._initialized = False
 
     async def peek(self, document: Document, options: dict[str, Any]) -> PeekResult:
@@ -131,8 +955,8 @@ class MistralProvider(DocumentProvider):
         # Extract basic metadata
         metadata = {
             "provider": self.get_name(),
-            "format": document.format or get_document_format(document.url),
-            "size": doc_path.stat().st_size if doc_path.exists() else document.size,
+            "format": self._cached_format(document),
+            "size": await asyncio.to_thread(_file_size, doc_path, document.size),
         }
 
         # For peek, we'll provide basic document info
@@ -187,10 +1011,10 @@ class MistralProvider(DocumentProvider):
         if not self._initialized:
             raise RuntimeError("Mistral provider not initialized")
 
-        doc_path = await self._ensure_local_document(document)
-
         # Extract text content for analysis
-        content = await self._extract_text(doc_path)
+        content = await self._load_text(
+            document, warm_tokenizer="max_chars" not in options
+        )
 
         # Use Mistral for deep analysis
         analysis = await self._analyze_content(content, options)
@@ -207,19 +1031,32 @@ class MistralProvider(DocumentProvider):
     async def extract(
         self, document: Document, options: dict[str, Any]
     ) -> ExtractResult:
-        """Extract content from document."""
+        """Extract content from document.
+
+        ``options["mode"]`` selects how: ``"simple"`` returns locally
+        extracted text without calling Mistral, ``"enhanced"`` lets Mistral
+        structure it. Structured requests default to enhanced, everything
+        else to simple.
+        """
         if not self._initialized:
             raise RuntimeError("Mistral provider not initialized")
 
-        doc_path = await self._ensure_local_document(document)
-        content = await self._extract_text(doc_path)
-
-        # Mistral can enhance extraction with structure understanding
         extract_format = options.get("format", "text")
+        mode = options.get(
+            "mode", "enhanced" if extract_format == "structured" else "simple"
+        )
+        content = await self._load_text(
+            document,
+            warm_tokenizer=extract_format == "structured" and mode == "enhanced",
+        )
 
         if extract_format == "structured":
-            # Use Mistral for structured extraction
-            content = await self._structured_extract(content, options)
+            if mode == "enhanced":
+                # Mistral can enhance extraction with structure understanding
+                content = await self._structured_extract(content, options)
+            else:
+                # Simple mode never calls the API; report what was returned
+                extract_format = "text"
 
         return ExtractResult(
             content=content,
@@ -228,35 +1065,259 @@ class MistralProvider(DocumentProvider):
 
     # Helper methods
 
+    async def _complete(
+        self,
+        system_prompt: str,
+        content: str,
+        model: str,
+        use_cache: bool = False,
+        **params: Any,
+    ) -> Any:
+        """Send a system + user chat completion request to Mistral.
+
+        With ``use_cache`` set and the response cache enabled, identical
+        requests are answered from the cache; with semantic caching enabled,
+        so is near-duplicate content sent with the same instructions.
+        """
+        if SystemMessage is None:
+            raise RuntimeError(
+                "mistralai package not installed. Install with: pip install mistralai"
+            )
+
+        cache = self._response_cache if use_cache else None
+        key = namespace = embedding = None
+        if cache is not None:
+            key = cache.make_key(model, system_prompt, content, params)
+            cached = cache.get_exact(key)
+            if cached is not None:
+                return cached
+
+            if self.config and self.config.semantic_cache and cache.semantic_available:
+                namespace = cache.make_key(model, system_prompt, params)
+                embedding = await self._embed(content)
+                if embedding is not None:
+                    cached = cache.get(namespace, embedding)
+                    if cached is not None:
+                        return cached
+
+        response = await self._call_with_retry(
+            model=model,
+            messages=[
+                SystemMessage(content=system_prompt),
+                UserMessage(content=content),
+            ],
+            **params,
+        )
+
+        # Only successful, non-empty responses are worth replaying
+        message = response.choices[0].message if response.choices else None
+        if cache is not None and message and (message.content or message.tool_calls):
+            cache.put(key, response, namespace, embedding)
+
+        return response
+
+    async def _call_with_retry(self, **request: Any) -> Any:
+        """Call chat.complete_async, retrying rate limits and transient errors.
+
+        In-flight requests are bounded by ``max_concurrency`` and, when
+        configured, requests/tokens per minute; the semaphore is released
+        while backing off so other requests can proceed.
+        """
+        max_retries = self.config.max_retries if self.config else 5
+        tokens = _estimate_request_tokens(request)
+
+        attempt = 0
+        while True:
+            await self._rate_limiter.acquire(tokens)
+            try:
+                async with self._request_slot():
+                    response = await self._client.chat.complete_async(**request)
+                self._rate_limiter.on_success()
+                return response
+            except Exception as e:
+                if getattr(e, "status_code", None) == 429:
+                    self._rate_limiter.on_rate_limited()
+                delay = _retry_delay(e, attempt) if attempt < max_retries else None
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"Mistral request failed ({e}); retrying in {delay:.1f}s "
+                    f"(attempt {attempt}/{max_retries})"
+                )
+                await asyncio.sleep(delay)
+
+    @contextlib.asynccontextmanager
+    async def _request_slot(self) -> AsyncIterator[None]:
+        """Hold one of the ``max_concurrency`` request slots.
+
+        Updates ``request_stats``: requests in flight (and the peak), callers
+        waiting for a slot, and how many arrived while all slots were taken.
+        """
+        if self._request_semaphore is None:
+            self._request_semaphore = asyncio.Semaphore(
+                self.config.max_concurrency if self.config else 8
+            )
+        stats = self.request_stats
+        if self._request_semaphore.locked():
+            stats["saturated"] += 1
+
+        stats["waiting"] += 1
+        try:
+            await self._request_semaphore.acquire()
+        finally:
+            stats["waiting"] -= 1
+
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            yield
+        finally:
+            stats["in_flight"] -= 1
+            self._request_semaphore.release()
+
+    async def _embed(self, content: str) -> Optional[list[float]]:
+        """Embed content for semantic cache lookups, or None if unavailable.
+
+        Shares the rate limiter and request slots with chat calls, so cache
+        lookups count against the same concurrency and per-minute budgets.
+        """
+        if len(content) > _MAX_EMBED_CHARS:
+            return None
+
+        await self._rate_limiter.acquire(_estimate_tokens(content))
+        try:
+            async with self._request_slot():
+                response = await self._client.embeddings.create_async(
+                    model=self.config.embedding_model, inputs=[content]
+                )
+            self._rate_limiter.on_success()
+            return response.data[0].embedding
+        except Exception as e:
+            if getattr(e, "status_code", None) == 429:
+                self._rate_limiter.on_rate_limited()
+            logger.warning(f"Embedding request failed, skipping semantic cache: {e}")
+            return None
+
+    async def _load_text(self, document: Document, warm_tokenizer: bool = False) -> str:
+        """Resolve a document locally and extract its text.
+
+        With ``warm_tokenizer`` set, the tokenizer that budgets the prompt is
+        loaded in a worker thread meanwhile, so its one-time cost overlaps the
+        download and parsing instead of following them.
+        """
+
+        async def load() -> str:
+            doc_path = await self._ensure_local_document(document)
+            return await self._extract_text(doc_path, document.hash)
+
+        if not warm_tokenizer:
+            return await load()
+        content, _ = await asyncio.gather(load(), asyncio.to_thread(_tokenizer))
+        return content
+
     async def _ensure_local_document(self, document: Document) -> Path:
-        """Ensure document is available locally."""
-        if document.path and document.path.exists():
-            return document.path
+        """Ensure document is available locally and its content hash is known."""
+        if document.path and await asyncio.to_thread(document.path.exists):
+            doc_path = document.path
+        else:
+            doc_path = await self._resolve_local_path(document.url)
+
+        document.path = doc_path
+        if not document.hash:
+            document.hash = await asyncio.to_thread(self._file_hash, doc_path)
+
+        return doc_path
 
-        if is_url(document.url):
-            return await download_document(document.url)
+    async def _resolve_local_path(self, url: str) -> Path:
+        """Download or resolve a document once per URL.
 
-        return await get_local_document(document.url)
+        Concurrent operations on the same URL wait for a single download,
+        which is forgotten once it finishes.
+        """
+        cached = self._local_paths.get(url)
+        if cached is not None and await asyncio.to_thread(cached.exists):
+            self._local_paths.move_to_end(url)
+            return cached
+
+        future = self._local_path_downloads.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_local_path(url))
+            self._local_path_downloads[url] = future
+            future.add_done_callback(
+                lambda _: self._local_path_downloads.pop(url, None)
+            )
+        # Shield so one cancelled operation does not cancel the others' download
+        return await asyncio.shield(future)
+
+    async def _fetch_local_path(self, url: str) -> Path:
+        if is_url(url):
+            doc_path = await download_document(url)
+        else:
+            doc_path = await get_local_document(url)
+        _remember(self._local_paths, url, doc_path)
+        return doc_path
+
+    def _cached_format(self, document: Document) -> Optional[str]:
+        """The document's format, sniffed from its URL once per URL."""
+        if document.format:
+            return document.format
+        if document.url in self._formats:
+            self._formats.move_to_end(document.url)
+            return self._formats[document.url]
+        doc_format = get_document_format(document.url)
+        _remember(self._formats, document.url, doc_format)
+        return doc_format
+
+    def _file_hash(self, doc_path: Path) -> str:
+        """Content hash of a file, reused while its mtime and size are unchanged."""
+        stat = doc_path.stat()
+        with self._file_hashes_lock:
+            cached = self._file_hashes.get(doc_path)
+            if cached is not None:
+                self._file_hashes.move_to_end(doc_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        content_hash = calculate_file_hash(doc_path)
+        with self._file_hashes_lock:
+            _remember(
+                self._file_hashes,
+                doc_path,
+                (stat.st_mtime_ns, stat.st_size, content_hash),
+            )
+        return content_hash
 
-    async def _extract_text(self, doc_path: Path) -> str:
+    async def _extract_text(
+        self, doc_path: Path, content_hash: Optional[str] = None
+    ) -> str:
         """Extract text from document.
 
         For PDFs, we'll use PyMuPDF as a fallback.
         Mistral OCR would be used for images/scanned content.
+        When ``content_hash`` is given, extracted PDF text is cached on disk
+        so later operations on the same file skip parsing.
         """
-        if doc_path.suffix.lower() == ".pdf":
+        suffix = doc_path.suffix.lower()
+        if suffix in _PDF_SUFFIXES:
             try:
-                import fitz
+                if content_hash:
+                    cached = await asyncio.to_thread(self._text_cache.get, content_hash)
+                    if cached is not None:
+                        return cached
+
+                # PyMuPDF is CPU-bound; keep the event loop free while it runs
+                markdown = bool(self.config and self.config.pdf_markdown)
+                text = await asyncio.to_thread(_extract_pdf_text, doc_path, markdown)
 
-                pdf = fitz.open(str(doc_path))
-                text = "\n\n".join(page.get_text() for page in pdf)
-                pdf.close()
+                if content_hash and text:
+                    await asyncio.to_thread(self._text_cache.put, content_hash, text)
                 return text
             except Exception as e:
                 logger.error(f"Failed to extract text from PDF: {e}")
                 return ""
-        elif doc_path.suffix.lower() in [".txt", ".md"]:
-            return doc_path.read_text(encoding="utf-8")
+        elif suffix in _PLAIN_TEXT_SUFFIXES:
+            return await asyncio.to_thread(doc_path.read_text, encoding="utf-8")
         else:
             logger.warning(f"Unsupported format for text extraction: {doc_path.suffix}")
             return ""
@@ -268,11 +1329,20 @@ class MistralProvider(DocumentProvider):
         if not self._client:
             return {"error": "Mistral client not initialized"}
 
+        if len(content.strip()) < options.get("min_chars", _MIN_CONTENT_CHARS):
+            logger.debug("Skipping Mistral analysis: insufficient content")
+            return {"analysis": "", "confidence": 0.0, "reason": "insufficient_content"}
+
         try:
             # Truncate content if too long (Mistral has token limits)
-            max_chars = options.get("max_chars", 8000)
-            if len(content) > max_chars:
-                content = content[:max_chars] + "\n\n[Content truncated...]"
+            if "max_chars" in options:
+                max_chars = options["max_chars"]
+                if len(content) > max_chars:
+                    content = content[:max_chars] + _TRUNCATION_MARKER
+            else:
+                content = _truncate_to_tokens(
+                    content, options.get("max_input_tokens", _MAX_INPUT_TOKENS)
+                )
 
             # Create analysis prompt
             system_prompt = options.get(
@@ -282,14 +1352,11 @@ class MistralProvider(DocumentProvider):
             )
 
             # Call Mistral API
-            from mistralai.models import SystemMessage, UserMessage
-
-            response = await self._client.chat.complete_async(
+            response = await self._complete(
+                system_prompt,
+                content,
                 model=self.config.model if self.config else "pixtral-12b-2409",
-                messages=[
-                    SystemMessage(content=system_prompt),
-                    UserMessage(content=content),
-                ],
+                use_cache=True,
             )
 
             analysis_text = (
@@ -318,30 +1385,34 @@ class MistralProvider(DocumentProvider):
         if not self._client:
             return {"error": "Mistral client not initialized"}
 
-        try:
-            schema = options.get("schema", {})
+        if len(content.strip()) < options.get("min_chars", _MIN_CONTENT_CHARS):
+            logger.debug("Skipping Mistral extraction: insufficient content")
+            return {"fields": [], "errors": ["empty_content"]}
 
-            # Create extraction prompt
-            system_prompt = f"""Extract structured data from the following document.
-Return a JSON object with the requested fields: {json.dumps(schema)}"""
+        try:
+            system_prompt = _structured_prompt(
+                _freeze_schema(options.get("schema", {}))
+            )
+            content = _truncate_to_tokens(
+                content, options.get("max_input_tokens", _MAX_INPUT_TOKENS)
+            )
 
-            from mistralai.models import SystemMessage, UserMessage
-
-            response = await self._client.chat.complete_async(
+            response = await self._complete(
+                system_prompt,
+                content,
                 model=self.config.model if self.config else "pixtral-12b-2409",
-                messages=[
-                    SystemMessage(content=system_prompt),
-                    UserMessage(content=content),
-                ],
+                use_cache=True,
+                response_format={"type": "json_object"},
             )
 
             result_text = (
                 response.choices[0].message.content if response.choices else "{}"
             )
 
-            # Try to parse as JSON
+            # JSON mode makes prose answers rare; a response cut off at the
+            # token limit can still be malformed
             try:
-                return json.loads(result_text)
+                return _loads(result_text)
             except json.JSONDecodeError:
                 return {"raw_result": result_text}
 
@@ -358,15 +1429,20 @@ Return a JSON object with the requested fields: {json.dumps(schema)}"""
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
         temperature: float = 0.0,
+        max_input_tokens: int = _MAX_INPUT_TOKENS,
     ) -> list[dict[str, Any]]:
         """Classify document pages into predefined categories.
 
+        Pages are packed into requests of roughly ``max_input_tokens`` each;
+        when more than one request is needed they run concurrently.
+
         Args:
             pages: List of page dicts with 'page' and 'textSample' keys
             labels: Valid classification labels
             model: Mistral model to use (default: from config)
             system_prompt: Custom system prompt (optional)
             temperature: Sampling temperature (0-1)
+            max_input_tokens: Approximate input token budget per request
 
         Returns:
             List of dicts with 'page', 'label', 'confidence' keys
@@ -379,53 +1455,174 @@ Return a JSON object with the requested fields: {json.dumps(schema)}"""
         if system_prompt is None:
             system_prompt = self._build_classification_prompt(labels)
 
-        try:
-            from mistralai.models import SystemMessage, UserMessage
+        logger.debug(f"Classifying {len(pages)} pages with model: {model}")
+        logger.debug(f"Classification labels: {labels}")
 
-            logger.debug(f"Classifying {len(pages)} pages with model: {model}")
-            logger.debug(f"Classification labels: {labels}")
+        # Pages with identical text (repeated boilerplate) are sent once and
+        # the representative's label is copied to the others. The text is
+        # read the same way the packers read it; pages without any are never
+        # merged, since there is nothing to show they are the same page.
+        duplicates: dict[Any, list[Any]] = {}
+        unique: dict[str, dict[str, Any]] = {}
+        distinct: list[dict[str, Any]] = []
+        for page in pages:
+            text = page.get("text") or page.get("textSample") or ""
+            first = unique.setdefault(text, page) if text else page
+            if first is page:
+                distinct.append(page)
+            else:
+                duplicates.setdefault(first.get("page"), []).append(page.get("page"))
+        if duplicates:
+            logger.debug(f"Classifying {len(distinct)} distinct page samples")
+            pages = distinct
+
+        chunks = _chunk_pages_by_tokens(pages, max_input_tokens)
+        if len(chunks) <= 1:
+            results = [
+                await self._classify_chunk(
+                    pages, labels, model, system_prompt, temperature
+                )
+            ]
+        else:
+            logger.debug(f"Classifying in {len(chunks)} concurrent requests")
+            results = await asyncio.gather(
+                *(
+                    self._classify_chunk(
+                        chunk, labels, model, system_prompt, temperature
+                    )
+                    for chunk in chunks
+                )
+            )
 
-            response = await self._client.chat.complete_async(
+        classified = [item for result in results for item in result]
+        if not duplicates:
+            return classified
+        return [
+            {**item, "page": page}
+            for item in classified
+            for page in [item["page"], *duplicates.get(item["page"], [])]
+        ]
+
+    async def _classify_chunk(
+        self,
+        pages: list[dict[str, Any]],
+        labels: list[str],
+        model: str,
+        system_prompt: str,
+        temperature: float,
+    ) -> list[dict[str, Any]]:
+        """Classify one chunk of pages in a single request."""
+        tool = (
+            _classification_tool(tuple(labels))
+            if self.config and self.config.tool_calling
+            else None
+        )
+        try:
+            response = await self._complete(
+                system_prompt,
+                _pack_pages(pages),
                 model=model,
-                messages=[
-                    SystemMessage(content=system_prompt),
-                    UserMessage(content=json.dumps(pages)),
-                ],
+                use_cache=True,
                 temperature=temperature,
-                response_format={"type": "json_object"},
+                **_output_params(tool),
+            )
+            tool_name = tool["function"]["name"] if tool else None
+            fast = _fast_classification(
+                response, _allowed_labels(tuple(labels)), tool_name
             )
+            if fast is not None:
+                return fast
 
-            # Extract response text with better error handling
-            if not response.choices:
-                logger.error("Mistral API returned empty response (no choices)")
-                return []
+            result = _response_json(response, tool_name)
+            return self._validate_classification_result(result, pages, labels)
 
-            result_text = response.choices[0].message.content
-            if not result_text:
-                logger.error("Mistral API returned empty content in response")
-                return []
+        except ValueError as e:
+            logger.error(str(e))
+            return []
+        except Exception as e:
+            logger.error(f"Page classification failed: {e}", exc_info=True)
+            return []
 
-            # Strip any whitespace and check if empty
-            result_text = result_text.strip()
-            if not result_text:
-                logger.error("Mistral API returned whitespace-only content")
-                return []
+    async def stream_classify_pages(
+        self,
+        pages: list[dict[str, Any]],
+        labels: list[str],
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.0,
+        max_input_tokens: int = _MAX_INPUT_TOKENS,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Classify pages, yielding each label as soon as it is streamed.
+
+        Uses streaming chat completions and decodes the "labels" array
+        incrementally, so callers can act on early pages while later ones
+        are still being generated. Chunks are streamed one after another,
+        each drained by a task that holds the request slot, so the slot is
+        released even if the consumer stops iterating. Responses are not
+        cached or retried mid-stream; use
+        ``classify_pages`` when only the complete result matters.
+
+        Yields:
+            Validated classification dicts with page, label and confidence
+        """
+        if not self._client:
+            raise RuntimeError("Mistral client not initialized")
+        if SystemMessage is None:
+            raise RuntimeError(
+                "mistralai package not installed. Install with: pip install mistralai"
+            )
 
-            logger.debug(f"Raw classification response: {result_text[:200]}...")
+        model = model or (self.config.model if self.config else "mistral-large-latest")
+        if system_prompt is None:
+            system_prompt = self._build_classification_prompt(labels)
+        label_set = _allowed_labels(tuple(labels))
 
-            # Parse JSON with better error handling
+        for chunk in _chunk_pages_by_tokens(pages, max_input_tokens):
+            request = {
+                "model": model,
+                "messages": [
+                    SystemMessage(content=system_prompt),
+                    UserMessage(content=_pack_pages(chunk)),
+                ],
+                "temperature": temperature,
+                "response_format": {"type": "json_object"},
+            }
+            # The stream is drained by a separate task that holds the request
+            # slot, so a slow or abandoned consumer never holds one
+            queue: asyncio.Queue = asyncio.Queue()
+            producer = asyncio.ensure_future(
+                self._stream_classification(request, label_set, queue)
+            )
             try:
-                result = json.loads(result_text)
-            except json.JSONDecodeError as je:
-                logger.error(f"Failed to parse Mistral response as JSON: {je}")
-                logger.error(f"Response text: {result_text[:500]}")
-                return []
-
-            return self._validate_classification_result(result, pages, labels)
-
+                while (item := await queue.get()) is not None:
+                    yield item
+            finally:
+                producer.cancel()
+
+    async def _stream_classification(
+        self, request: dict[str, Any], label_set: frozenset, queue: asyncio.Queue
+    ) -> None:
+        """Put valid labels from one streamed request on ``queue``, then None."""
+        parser = _JSONArrayStream("labels")
+        try:
+            await self._rate_limiter.acquire(_estimate_request_tokens(request))
+            async with self._request_slot():
+                stream = await self._client.chat.stream_async(**request)
+                async for event in stream:
+                    choices = event.data.choices
+                    delta = choices[0].delta.content if choices else None
+                    if not isinstance(delta, str):
+                        continue
+                    for item in parser.feed(delta):
+                        if _is_valid_classification(item, label_set):
+                            queue.put_nowait(item)
+            self._rate_limiter.on_success()
         except Exception as e:
-            logger.error(f"Page classification failed: {e}", exc_info=True)
-            return []
+            if getattr(e, "status_code", None) == 429:
+                self._rate_limiter.on_rate_limited()
+            logger.error(f"Streaming page classification failed: {e}")
+        finally:
+            queue.put_nowait(None)
 
     async def extract_fields(
         self,
@@ -433,14 +1630,20 @@ Return a JSON object with the requested fields: {json.dumps(schema)}"""
         inputs: list[dict[str, Any]],
         model: Optional[str] = None,
         temperature: float = 0.0,
+        max_input_tokens: int = _MAX_INPUT_TOKENS,
     ) -> dict[str, Any]:
         """Extract structured fields from document text.
 
+        Pages are packed into requests of roughly ``max_input_tokens`` each;
+        when more than one request is needed they run concurrently and the
+        per-request fields are merged.
+
         Args:
             schema: Field definitions with name, type, pattern
             inputs: List of page dicts with 'page' and 'text' keys
             model: Mistral model to use
             temperature: Sampling temperature
+            max_input_tokens: Approximate input token budget per request
 
         Returns:
             Dict with 'fields' array and optional 'errors' array
@@ -449,62 +1652,151 @@ Return a JSON object with the requested fields: {json.dumps(schema)}"""
             raise RuntimeError("Mistral client not initialized")
 
         model = model or (self.config.model if self.config else "mistral-large-latest")
-        system_prompt = self._build_extraction_prompt(schema)
+        schema_json = _freeze_schema(schema)
+        system_prompt = _extraction_prompt(schema_json)
+        tool = (
+            _extraction_tool(schema_json)
+            if self.config and self.config.tool_calling
+            else None
+        )
 
-        try:
-            from mistralai.models import SystemMessage, UserMessage
+        logger.debug(f"Extracting fields with model: {model}")
+        logger.debug(f"Schema fields: {[f['name'] for f in schema.get('fields', [])]}")
+        logger.debug(f"Processing {len(inputs)} page(s)")
 
-            logger.debug(f"Extracting fields with model: {model}")
-            logger.debug(
-                f"Schema fields: {[f['name'] for f in schema.get('fields', [])]}"
+        chunks = _chunk_pages_by_tokens(inputs, max_input_tokens)
+        if len(chunks) <= 1:
+            return await self._extract_chunk(
+                inputs, schema, model, system_prompt, temperature, tool
             )
-            logger.debug(f"Processing {len(inputs)} page(s)")
 
-            response = await self._client.chat.complete_async(
+        logger.debug(f"Extracting in {len(chunks)} concurrent requests")
+        results = await asyncio.gather(
+            *(
+                self._extract_chunk(
+                    chunk, schema, model, system_prompt, temperature, tool
+                )
+                for chunk in chunks
+            )
+        )
+        return _merge_extraction_results(results)
+
+    async def _extract_chunk(
+        self,
+        inputs: list[dict[str, Any]],
+        schema: dict[str, Any],
+        model: str,
+        system_prompt: str,
+        temperature: float,
+        tool: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """Extract fields from one chunk of pages in a single request."""
+        try:
+            response = await self._complete(
+                system_prompt,
+                _pack_pages(inputs),
                 model=model,
-                messages=[
-                    SystemMessage(content=system_prompt),
-                    UserMessage(content=json.dumps(inputs)),
-                ],
+                use_cache=True,
                 temperature=temperature,
-                response_format={"type": "json_object"},
+                **_output_params(tool),
             )
+            tool_name = tool["function"]["name"] if tool else None
+            fast = _fast_extraction(response, tool_name)
+            if fast is not None:
+                return fast
+            result = _response_json(response, tool_name)
+            return self._validate_extraction_result(result, schema)
 
-            # Extract response text with better error handling
-            if not response.choices:
-                error_msg = "Mistral API returned empty response (no choices)"
-                logger.error(error_msg)
-                return {"fields": [], "errors": [error_msg]}
+        except ValueError as e:
+            logger.error(str(e))
+            return {"fields": [], "errors": [str(e)]}
+        except Exception as e:
+            logger.error(f"Field extraction failed: {e}", exc_info=True)
+            return {"fields": [], "errors": [str(e)]}
 
-            result_text = response.choices[0].message.content
-            if not result_text:
-                error_msg = "Mistral API returned empty content in response"
-                logger.error(error_msg)
-                return {"fields": [], "errors": [error_msg]}
+    async def analyze_pages(
+        self,
+        pages: list[dict[str, Any]],
+        labels: list[str],
+        schema: dict[str, Any],
+        model: Optional[str] = None,
+        temperature: float = 0.0,
+        max_input_tokens: int = _MAX_INPUT_TOKENS,
+    ) -> dict[str, Any]:
+        """Classify pages and extract fields in a single request per chunk.
 
-            # Strip any whitespace and check if empty
-            result_text = result_text.strip()
-            if not result_text:
-                error_msg = "Mistral API returned whitespace-only content"
-                logger.error(error_msg)
-                return {"fields": [], "errors": [error_msg]}
+        Equivalent to calling ``classify_pages`` and ``extract_fields`` on the
+        same pages, but each page is sent once instead of twice, roughly
+        halving input tokens and round-trips. The model handles both tasks in
+        one answer, which can cost a little accuracy on either.
 
-            logger.debug(f"Raw extraction response: {result_text[:200]}...")
+        Args:
+            pages: List of page dicts with 'page' and 'text' keys
+            labels: Valid classification labels
+            schema: Field definitions with name, type, pattern
+            model: Mistral model to use
+            temperature: Sampling temperature
+            max_input_tokens: Approximate input token budget per request
 
-            # Parse JSON with better error handling
-            try:
-                result = json.loads(result_text)
-            except json.JSONDecodeError as je:
-                error_msg = f"Failed to parse Mistral response as JSON: {je}"
-                logger.error(error_msg)
-                logger.error(f"Response text: {result_text[:500]}")
-                return {"fields": [], "errors": [error_msg]}
+        Returns:
+            Dict with 'labels' (as from ``classify_pages``), 'fields' and
+            optional 'errors' (as from ``extract_fields``)
+        """
+        if not self._client:
+            raise RuntimeError("Mistral client not initialized")
 
-            return self._validate_extraction_result(result, schema)
+        model = model or (self.config.model if self.config else "mistral-large-latest")
+        system_prompt = _analysis_prompt(tuple(labels), _freeze_schema(schema))
+
+        results = await asyncio.gather(
+            *(
+                self._analyze_chunk(
+                    chunk, labels, schema, model, system_prompt, temperature
+                )
+                for chunk in _chunk_pages_by_tokens(pages, max_input_tokens)
+            )
+        )
+
+        merged = _merge_extraction_results([fields for _, fields in results])
+        merged["labels"] = [item for page_labels, _ in results for item in page_labels]
+        return merged
 
+    async def _analyze_chunk(
+        self,
+        pages: list[dict[str, Any]],
+        labels: list[str],
+        schema: dict[str, Any],
+        model: str,
+        system_prompt: str,
+        temperature: float,
+    ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """Classify and extract one chunk of pages in a single request."""
+        try:
+            response = await self._complete(
+                system_prompt,
+                _pack_pages(pages),
+                model=model,
+                use_cache=True,
+                temperature=temperature,
+                response_format={"type": "json_object"},
+            )
+            result = _response_json(response)
+            if not isinstance(result, dict):
+                raise ValueError(f"Expected a JSON object, got {type(result)}")
+
+        except ValueError as e:
+            logger.error(str(e))
+            return [], {"fields": [], "errors": [str(e)]}
         except Exception as e:
-            logger.error(f"Field extraction failed: {e}", exc_info=True)
-            return {"fields": [], "errors": [str(e)]}
+            logger.error(f"Page analysis failed: {e}", exc_info=True)
+            return [], {"fields": [], "errors": [str(e)]}
+
+        return (
+            self._validate_classification_result(
+                {"labels": result.get("labels")}, pages, labels
+            ),
+            self._validate_extraction_result(result, schema),
+        )
 
     async def summarize_pages(
         self,
@@ -513,113 +1805,553 @@ Return a JSON object with the requested fields: {json.dumps(schema)}"""
         model: Optional[str] = None,
         max_tokens: int = 512,
         temperature: float = 0.3,
+        max_concurrency: int = 8,
+        batch_size: int = 8,
+        max_input_tokens: Optional[int] = None,
     ) -> list[dict[str, Any]]:
         """Generate summaries for document pages.
 
+        Consecutive pages are packed into requests of up to ``batch_size``
+        pages and ``max_input_tokens`` input tokens, which cuts round-trips
+        and per-request rate-limit pressure without overflowing the context
+        on text-heavy pages. Requests run
+        concurrently, with at most ``max_concurrency`` in flight, so
+        wall-clock time follows the slowest request rather than the sum of
+        all requests. Pages with identical text (blank or boilerplate pages)
+        are summarized once and the summary reused.
+
         Args:
             pages: List of page dicts with 'page' and 'text' keys
             style: Summary style (bullet, paragraph, executive)
             model: Mistral model to use (default: mistral-small-latest)
             max_tokens: Maximum tokens per summary
             temperature: Sampling temperature
+            max_concurrency: Maximum number of concurrent API requests
+            batch_size: Maximum pages per request (1 sends one per page)
+            max_input_tokens: Input token budget per request (default from
+                config, else 6000)
 
         Returns:
-            List of dicts with 'page' and 'summary' keys
+            List of dicts with 'page' and 'summary' keys, in input page order
         """
         if not self._client:
             raise RuntimeError("Mistral client not initialized")
 
         model = model or "mistral-small-latest"
-        summaries = []
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        batch_size = max(1, batch_size)
 
+        # One representative page per distinct text, in first-seen order
+        unique: dict[str, dict[str, Any]] = {}
         for page in pages:
-            try:
-                system_prompt = self._build_summary_prompt(style)
+            unique.setdefault(page.get("text", ""), page)
 
-                from mistralai.models import SystemMessage, UserMessage
+        summary_by_text = {
+            text: {"page": page.get("page"), "summary": ""}
+            for text, page in unique.items()
+            if not text.strip()
+        }
+        to_send = [page for text, page in unique.items() if text.strip()]
+        if max_input_tokens is None:
+            max_input_tokens = (
+                self.config.summary_chunk_tokens if self.config else _MAX_INPUT_TOKENS
+            )
+        groups = [
+            chunk[i : i + batch_size]
+            for chunk in _chunk_pages_by_tokens(to_send, max_input_tokens)
+            for i in range(0, len(chunk), batch_size)
+        ]
+
+        # gather() preserves input order, so results line up with groups; an
+        # unexpected failure in one group must not discard the others
+        results = await asyncio.gather(
+            *(
+                (
+                    self._summary_coalescer.submit(
+                        (style, model, max_tokens, temperature, max_input_tokens), group
+                    )
+                    if self._summary_coalescer is not None and len(group) < batch_size
+                    else self._summarize_group(
+                        group, style, model, max_tokens, temperature, semaphore
+                    )
+                )
+                for group in groups
+            ),
+            return_exceptions=True,
+        )
+        for group, summaries in zip(groups, results):
+            if isinstance(summaries, BaseException) and not isinstance(
+                summaries, Exception
+            ):
+                # Cancellation (or interpreter exit) must not become a summary
+                raise summaries
+            if isinstance(summaries, Exception):
+                logger.error(f"Summarization failed: {summaries}")
+                summaries = [
+                    {"page": page.get("page"), "summary": f"Error: {summaries}"}
+                    for page in group
+                ]
+            for page, summary in zip(group, summaries):
+                summary_by_text[page.get("text", "")] = summary
+
+        return [
+            {**summary_by_text[page.get("text", "")], "page": page.get("page")}
+            for page in pages
+        ]
+
+    async def _summarize_group(
+        self,
+        group: list[dict[str, Any]],
+        style: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        semaphore: asyncio.Semaphore,
+    ) -> list[dict[str, Any]]:
+        """Summarize a group of pages in one request; results follow ``group``."""
+        if len(group) == 1:
+            page = await self._summarize_page(
+                group[0],
+                self._build_summary_prompt(style),
+                model,
+                max_tokens,
+                temperature,
+                semaphore,
+            )
+            return [page]
 
-                response = await self._client.chat.complete_async(
+        try:
+            async with semaphore:
+                response = await self._complete(
+                    _batch_summary_prompt(style),
+                    _pack_pages(group),
                     model=model,
-                    messages=[
-                        SystemMessage(content=system_prompt),
-                        UserMessage(content=page["text"]),
-                    ],
+                    use_cache=True,
                     temperature=temperature,
-                    max_tokens=max_tokens,
+                    max_tokens=max_tokens * len(group),
+                    response_format={"type": "json_object"},
                 )
+            result = _response_json(response)
+            items = result.get("summaries", []) if isinstance(result, dict) else result
+            by_page = {
+                item["page"]: item["summary"]
+                for item in items
+                if isinstance(item, dict)
+                and "page" in item
+                and isinstance(item.get("summary"), str)
+            }
+        except Exception as e:
+            pages_desc = [p.get("page") for p in group]
+            logger.error(f"Summarization failed for pages {pages_desc}: {e}")
+            return [{"page": p.get("page"), "summary": f"Error: {e}"} for p in group]
+
+        return [
+            {
+                "page": p.get("page"),
+                "summary": by_page.get(
+                    p.get("page"), "Error: no summary returned for page"
+                ),
+            }
+            for p in group
+        ]
+
+    async def merge_summaries(
+        self,
+        summaries: list[dict[str, Any]],
+        style: str = "bullet",
+        model: Optional[str] = None,
+        max_tokens: int = 512,
+        temperature: float = 0.3,
+        max_input_tokens: Optional[int] = None,
+    ) -> str:
+        """Merge page summaries into one document summary.
+
+        Summaries are merged hierarchically: consecutive summaries are packed
+        into token-budgeted chunks, each chunk is merged in one request, and
+        the results are merged again until a single summary remains.
+
+        Args:
+            summaries: Page summaries as returned by summarize_pages
+            style: Summary style (bullet, paragraph, executive)
+            model: Mistral model to use (default: mistral-small-latest)
+            max_tokens: Maximum tokens per merged summary
+            temperature: Sampling temperature
+            max_input_tokens: Input token budget per request (default from
+                config, else 6000)
 
-                summary_text = (
-                    response.choices[0].message.content if response.choices else ""
+        Returns:
+            The document summary, or an empty string if there is nothing to merge
+
+        Raises:
+            Exception: Any error from a merge request; the page summaries are
+                left for the caller to return on their own
+        """
+        if not self._client:
+            raise RuntimeError("Mistral client not initialized")
+
+        model = model or "mistral-small-latest"
+        if max_input_tokens is None:
+            max_input_tokens = (
+                self.config.summary_chunk_tokens if self.config else _MAX_INPUT_TOKENS
+            )
+        texts = [
+            item["summary"]
+            for item in summaries
+            if item.get("summary") and not item["summary"].startswith("Error:")
+        ]
+        if len(texts) <= 1:
+            return texts[0] if texts else ""
+
+        while len(texts) > 1:
+            chunks = _chunk_pages_by_tokens(
+                [{"text": text} for text in texts], max_input_tokens
+            )
+            # A budget too small for two summaries would never converge
+            if len(chunks) == len(texts):
+                chunks = [sum(chunks[i : i + 2], []) for i in range(0, len(chunks), 2)]
+            responses = await asyncio.gather(
+                *(
+                    self._complete(
+                        _merge_summary_prompt(style),
+                        "\n\n".join(page["text"] for page in chunk),
+                        model=model,
+                        use_cache=True,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                    )
+                    for chunk in chunks
                 )
+            )
+            texts = [
+                response.choices[0].message.content if response.choices else ""
+                for response in responses
+            ]
 
-                summaries.append({"page": page["page"], "summary": summary_text})
+        return texts[0]
 
-            except Exception as e:
-                logger.error(f"Summarization failed for page {page.get('page')}: {e}")
-                summaries.append(
-                    {"page": page.get("page"), "summary": f"Error: {str(e)}"}
+    async def _summarize_coalesced(
+        self, key: tuple, pages: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Summarize pages merged from concurrent calls, possibly of several docs.
+
+        Pages are renumbered by position for the request, since page numbers
+        from different documents can collide, and restored afterwards. The
+        merged pages are regrouped under the same input token budget as
+        summarize_pages.
+        """
+        style, model, max_tokens, temperature, max_input_tokens = key
+        numbered = [
+            {"page": idx, "text": page["text"]} for idx, page in enumerate(pages)
+        ]
+        groups = [
+            chunk[i : i + _COALESCED_BATCH_SIZE]
+            for chunk in _chunk_pages_by_tokens(numbered, max_input_tokens)
+            for i in range(0, len(chunk), _COALESCED_BATCH_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(len(groups))
+        results = await asyncio.gather(
+            *(
+                self._summarize_group(
+                    group, style, model, max_tokens, temperature, semaphore
                 )
+                for group in groups
+            )
+        )
+        summaries = [summary for result in results for summary in result]
+        return [
+            {**summary, "page": page.get("page")}
+            for page, summary in zip(pages, summaries)
+        ]
 
-        return summaries
+    async def _summarize_page(
+        self,
+        page: dict[str, Any],
+        system_prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        semaphore: asyncio.Semaphore,
+    ) -> dict[str, Any]:
+        """Summarize a single page, bounded by the shared semaphore."""
+        if not page.get("text", "").strip():
+            return {"page": page.get("page"), "summary": ""}
 
-    def _build_classification_prompt(self, labels: list[str]) -> str:
-        """Build system prompt for page classification."""
-        return f"""You are analyzing a company's annual report. Below is a list \
-of pages with page numbers and text samples. Classify each page into one of \
-these categories: {', '.join(labels)}.
+        try:
+            async with semaphore:
+                response = await self._complete(
+                    system_prompt,
+                    page["text"],
+                    model=model,
+                    use_cache=True,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
 
-IMPORTANT: You MUST return a JSON object with a "labels" array containing \
-the classification results.
+            summary_text = (
+                response.choices[0].message.content if response.choices else ""
+            )
 
-Return JSON object with this exact format: \
-{{"labels": [{{"page": int, "label": string, "confidence": float}}]}}.
+            return {"page": page["page"], "summary": summary_text}
 
-Rules:
-- Do not include EBITDA reconciliation pages under income_statement
-- Multi-page sections should have same label across consecutive pages
-- Use 'other' for unclassifiable pages
-- Confidence must be between 0.0 and 1.0
-- Return ONLY the JSON object, no other text"""
+        except Exception as e:
+            logger.error(f"Summarization failed for page {page.get('page')}: {e}")
+            return {"page": page.get("page"), "summary": f"Error: {str(e)}"}
 
-    def _build_extraction_prompt(self, schema: dict[str, Any]) -> str:
-        """Build system prompt for field extraction."""
-        fields_desc = "\n".join(
-            [
-                f"- {f['name']} (type: {f['type']}, "
-                f"pattern: {f.get('pattern', 'any')})"
-                for f in schema.get("fields", [])
-            ]
+    # Batch API
+
+    async def classify_pages_batch(
+        self,
+        pages: list[dict[str, Any]],
+        labels: list[str],
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.0,
+        max_input_tokens: int = _MAX_INPUT_TOKENS,
+        wait: bool = True,
+        poll_interval: float = 10.0,
+        timeout: float = 3600.0,
+    ) -> Union[list[dict[str, Any]], dict[str, Any]]:
+        """Classify document pages through Mistral's Batch API.
+
+        Batch jobs are billed at a discount and do not count against the
+        interactive rate limits, but complete asynchronously; use this for
+        bulk work nobody is waiting on. Pages are chunked as in
+        ``classify_pages``, one batch request per chunk.
+
+        Args:
+            pages: List of page dicts with 'page' and 'textSample' keys
+            labels: Valid classification labels
+            model: Mistral model to use (default: from config)
+            system_prompt: Custom system prompt (optional)
+            temperature: Sampling temperature (0-1)
+            max_input_tokens: Approximate input token budget per request
+            wait: Poll until the job finishes and return its results
+            poll_interval: Seconds between job status checks
+            timeout: Maximum seconds to wait for the job
+
+        Returns:
+            Classification list as from ``classify_pages`` when ``wait`` is
+            set, otherwise a dict with the batch 'job_id' and 'status' to pass
+            to ``collect_classification_batch`` later
+        """
+        if not self._client:
+            raise RuntimeError("Mistral client not initialized")
+
+        model = model or (self.config.model if self.config else "mistral-large-latest")
+        if system_prompt is None:
+            system_prompt = self._build_classification_prompt(labels)
+
+        requests = [
+            {
+                "custom_id": str(idx),
+                "body": {
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": _pack_pages(chunk)},
+                    ],
+                    "temperature": temperature,
+                    "response_format": {"type": "json_object"},
+                },
+            }
+            for idx, chunk in enumerate(_chunk_pages_by_tokens(pages, max_input_tokens))
+        ]
+        job = await self._submit_batch(requests, model, {"task": "classify_pages"})
+
+        if not wait:
+            return {"job_id": job.id, "status": job.status}
+        return await self.collect_classification_batch(
+            job.id, labels, poll_interval=poll_interval, timeout=timeout
         )
 
-        return f"""Extract the following fields from financial statement text:
-{fields_desc}
+    async def collect_classification_batch(
+        self,
+        job_id: str,
+        labels: list[str],
+        poll_interval: float = 10.0,
+        timeout: float = 3600.0,
+    ) -> list[dict[str, Any]]:
+        """Wait for a classification batch job and return its page labels."""
+        outputs = await self._wait_for_batch(job_id, poll_interval, timeout)
 
-IMPORTANT: You MUST return ONLY a valid JSON object, with no additional \
-text or explanation.
+        label_set = _allowed_labels(tuple(labels))
+        results: list[dict[str, Any]] = []
+        for custom_id in sorted(outputs, key=int):
+            try:
+                response = _batch_response(outputs[custom_id])
+                fast = _fast_classification(response, label_set)
+                if fast is not None:
+                    results.extend(fast)
+                    continue
+                result = _response_json(response)
+            except ValueError as e:
+                logger.error(f"Batch request {custom_id} of job {job_id}: {e}")
+                continue
+            results.extend(self._validate_classification_result(result, [], labels))
+        return results
 
-Return JSON object with this exact format: {{"fields": [{{"name": string, \
-"value": typed_value, "confidence": float, "source": {{"page": int, \
-"lineIdx": int?}}}}], "errors": []}}.
+    async def extract_fields_batch(
+        self,
+        schema: dict[str, Any],
+        inputs: list[dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: float = 0.0,
+        max_input_tokens: int = _MAX_INPUT_TOKENS,
+        wait: bool = True,
+        poll_interval: float = 10.0,
+        timeout: float = 3600.0,
+    ) -> dict[str, Any]:
+        """Extract structured fields through Mistral's Batch API.
 
-Rules:
-- Return null for missing fields
-- Include confidence score (0.0-1.0)
-- Preserve data types (numbers as numbers, dates as ISO strings)
-- Extract source page and line index when possible
-- Return ONLY the JSON object, no other text"""
+        The batch counterpart of ``extract_fields``: pages are chunked the
+        same way, one batch request per chunk, and per-chunk fields are
+        merged once the job completes.
 
-    def _build_summary_prompt(self, style: str) -> str:
-        """Build system prompt for summarization."""
-        style_instructions = {
-            "bullet": "Create a concise bullet-point summary (3-5 points).",
-            "paragraph": "Write a single paragraph summary (3-4 sentences).",
-            "executive": "Provide an executive summary highlighting key insights.",
-        }
+        Args:
+            schema: Field definitions with name, type, pattern
+            inputs: List of page dicts with 'page' and 'text' keys
+            model: Mistral model to use (default: from config)
+            temperature: Sampling temperature
+            max_input_tokens: Approximate input token budget per request
+            wait: Poll until the job finishes and return its results
+            poll_interval: Seconds between job status checks
+            timeout: Maximum seconds to wait for the job
 
-        return f"""Summarize the following page content.
-{style_instructions.get(style, style_instructions['bullet'])}
+        Returns:
+            Dict with 'fields' and 'errors' as from ``extract_fields`` when
+            ``wait`` is set, otherwise a dict with the batch 'job_id' and
+            'status' to pass to ``collect_extraction_batch`` later
+        """
+        if not self._client:
+            raise RuntimeError("Mistral client not initialized")
 
-Focus on factual information and key data points. Avoid speculation."""
+        model = model or (self.config.model if self.config else "mistral-large-latest")
+        system_prompt = _extraction_prompt(_freeze_schema(schema))
+
+        requests = [
+            {
+                "custom_id": str(idx),
+                "body": {
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": _pack_pages(chunk)},
+                    ],
+                    "temperature": temperature,
+                    "response_format": {"type": "json_object"},
+                },
+            }
+            for idx, chunk in enumerate(
+                _chunk_pages_by_tokens(inputs, max_input_tokens)
+            )
+        ]
+        job = await self._submit_batch(requests, model, {"task": "extract_fields"})
+
+        if not wait:
+            return {"job_id": job.id, "status": job.status}
+        return await self.collect_extraction_batch(
+            job.id, schema, poll_interval=poll_interval, timeout=timeout
+        )
+
+    async def collect_extraction_batch(
+        self,
+        job_id: str,
+        schema: dict[str, Any],
+        poll_interval: float = 10.0,
+        timeout: float = 3600.0,
+    ) -> dict[str, Any]:
+        """Wait for an extraction batch job and return its merged fields."""
+        outputs = await self._wait_for_batch(job_id, poll_interval, timeout)
+
+        results: list[dict[str, Any]] = []
+        for custom_id in sorted(outputs, key=int):
+            try:
+                response = _batch_response(outputs[custom_id])
+                fast = _fast_extraction(response)
+                if fast is not None:
+                    results.append(fast)
+                    continue
+                result = _response_json(response)
+            except ValueError as e:
+                logger.error(f"Batch request {custom_id} of job {job_id}: {e}")
+                results.append({"fields": [], "errors": [str(e)]})
+                continue
+            results.append(self._validate_extraction_result(result, schema))
+        return _merge_extraction_results(results)
+
+    async def _submit_batch(
+        self,
+        requests: list[dict[str, Any]],
+        model: str,
+        metadata: Optional[dict[str, str]] = None,
+    ) -> Any:
+        """Upload requests as a JSONL file and start a batch job on it."""
+        payload = "\n".join(_dumps(request) for request in requests).encode("utf-8")
+        uploaded = await self._client.files.upload_async(
+            file={"file_name": "docsray_batch.jsonl", "content": payload},
+            purpose="batch",
+        )
+        job = await self._client.batch.jobs.create_async(
+            input_files=[uploaded.id],
+            model=model,
+            endpoint=_BATCH_ENDPOINT,
+            metadata=metadata,
+        )
+        logger.info(f"Submitted Mistral batch job {job.id} ({len(requests)} requests)")
+        return job
+
+    async def _wait_for_batch(
+        self, job_id: str, poll_interval: float, timeout: float
+    ) -> dict[str, dict[str, Any]]:
+        """Poll a batch job until it finishes; return outputs by custom_id.
+
+        Raises:
+            TimeoutError: If the job is still running after ``timeout``
+            RuntimeError: If the job finished without producing any output
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            job = await self._client.batch.jobs.get_async(job_id=job_id)
+            if job.status in _BATCH_DONE_STATUSES:
+                break
+            if loop.time() >= deadline:
+                raise TimeoutError(
+                    f"Mistral batch job {job_id} still {job.status} after {timeout}s"
+                )
+            await asyncio.sleep(poll_interval)
+
+        if not job.output_file:
+            raise RuntimeError(f"Mistral batch job {job_id} ended as {job.status}")
+        if job.status != "SUCCESS":
+            logger.warning(
+                f"Mistral batch job {job_id} ended as {job.status}; "
+                f"using partial results"
+            )
+
+        response = await self._client.files.download_async(file_id=job.output_file)
+        try:
+            data = await response.aread()
+        finally:
+            await response.aclose()
+
+        outputs: dict[str, dict[str, Any]] = {}
+        # Both parsers take UTF-8 bytes, so the file is never decoded as a whole
+        for line in data.splitlines():
+            if line.strip():
+                entry = _loads(line)
+                outputs[entry["custom_id"]] = entry
+        return outputs
+
+    def _build_classification_prompt(self, labels: list[str]) -> str:
+        """Build system prompt for page classification."""
+        return _classification_prompt(tuple(labels))
+
+    def _build_extraction_prompt(self, schema: dict[str, Any]) -> str:
+        """Build system prompt for field extraction."""
+        return _extraction_prompt(_freeze_schema(schema))
+
+    def _build_summary_prompt(self, style: str) -> str:
+        """Build system prompt for summarization."""
+        return _summary_prompt(style)
 
     def _validate_classification_result(
         self, result: Any, pages: list[dict], labels: list[str]
@@ -627,40 +2359,20 @@ Focus on factual information and key data points. Avoid speculation."""
         """Validate and clean classification results."""
         if not isinstance(result, list):
             if isinstance(result, dict):
-                result = result.get("labels", [])
-                if not result:
-                    logger.warning("Classification result dict has no 'labels' key")
+                result = result.get("labels")
+                if not isinstance(result, list):
+                    logger.warning("Classification result dict has no 'labels' list")
+                    result = []
             else:
                 logger.warning(f"Expected list or dict, got {type(result)}")
                 result = []
 
-        validated = []
-        skipped = 0
-        for item in result:
-            if not isinstance(item, dict):
-                skipped += 1
-                continue
-
-            if not all(k in item for k in ["page", "label", "confidence"]):
-                logger.warning(f"Classification item missing required keys: {item}")
-                skipped += 1
-                continue
-
-            if item["label"] not in labels and item["label"] != "other":
-                logger.warning(f"Invalid label '{item['label']}' not in {labels}")
-                skipped += 1
-                continue
-
-            if not 0.0 <= item["confidence"] <= 1.0:
-                logger.warning(
-                    f"Invalid confidence {item['confidence']} "
-                    f"for page {item.get('page')}"
-                )
-                skipped += 1
-                continue
-
-            validated.append(item)
+        label_set = _allowed_labels(tuple(labels))
+        validated = [
+            item for item in result if _is_valid_classification(item, label_set)
+        ]
 
+        skipped = len(result) - len(validated)
         if skipped > 0:
             logger.warning(f"Skipped {skipped} invalid classification items")
 
@@ -685,20 +2397,13 @@ Focus on factual information and key data points. Avoid speculation."""
             logger.warning(f"Fields is not a list: {type(fields)}")
             fields = []
 
-        validated_fields = []
-        skipped = 0
-        for field in fields:
-            if not isinstance(field, dict):
-                skipped += 1
-                continue
-
-            if not all(k in field for k in ["name", "value", "confidence"]):
-                logger.warning(f"Field missing required keys: {field}")
-                skipped += 1
-                continue
-
-            validated_fields.append(field)
+        validated_fields = [
+            field
+            for field in fields
+            if isinstance(field, dict) and field.keys() >= _EXTRACTION_KEYS
+        ]
 
+        skipped = len(fields) - len(validated_fields)
         if skipped > 0:
             logger.warning(f"Skipped {skipped} invalid field extractions")
 
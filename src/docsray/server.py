@@ -433,13 +433,15 @@ class DocsrayServer:
             document_url: str = Field(..., description="URL or local path to PDF document"),
             labels: List[str] = Field(..., description="Valid classification labels (e.g., income_statement, balance_sheet)"),
             model: Optional[str] = Field(None, description="Mistral model (default: mistral-large-latest)"),
-            page_range: Optional[Dict[str, int]] = Field(None, description="Optional page range to classify (start, end)")
+            page_range: Optional[Dict[str, int]] = Field(None, description="Optional page range to classify (start, end)"),
+            mode: str = Field("sync", description="Execution mode: sync (default) or batch (Mistral Batch API, cheaper but slower)")
         ) -> Dict[str, Any]:
             return await mistral_tools.handle_classify_pages(
                 document_url=document_url,
                 labels=labels,
                 model=model,
                 page_range=page_range,
+                mode=mode,
                 registry=self.registry,
                 cache=self.cache
             )
@@ -452,13 +454,15 @@ class DocsrayServer:
             document_url: str = Field(..., description="URL or local path to PDF document"),
             schema: Dict[str, Any] = Field(..., description="Field definitions to extract (fields array with name, type)"),
             page_filter: Optional[Dict[str, Any]] = Field(None, description="Optional filter for which pages to extract from"),
-            model: Optional[str] = Field(None, description="Mistral model (default: mistral-large-latest)")
+            model: Optional[str] = Field(None, description="Mistral model (default: mistral-large-latest)"),
+            mode: str = Field("sync", description="Execution mode: sync (default) or batch (Mistral Batch API, cheaper but slower)")
         ) -> Dict[str, Any]:
             return await mistral_tools.handle_extract_fields(
                 document_url=document_url,
                 schema=schema,
                 page_filter=page_filter,
                 model=model,
+                mode=mode,
                 registry=self.registry,
                 cache=self.cache
             )
@@ -472,7 +476,8 @@ class DocsrayServer:
             style: str = Field("bullet", description="Summary style (bullet, paragraph, executive)"),
             page_range: Optional[Dict[str, int]] = Field(None, description="Optional page range to summarize (start, end)"),
             model: Optional[str] = Field(None, description="Mistral model (default: mistral-small-latest)"),
-            max_tokens: int = Field(512, description="Maximum tokens per summary")
+            max_tokens: int = Field(512, description="Maximum tokens per summary"),
+            merge: bool = Field(False, description="Also merge page summaries into one document summary")
         ) -> Dict[str, Any]:
             return await mistral_tools.handle_summarize(
                 document_url=document_url,
@@ -480,6 +485,7 @@ class DocsrayServer:
                 page_range=page_range,
                 model=model,
                 max_tokens=max_tokens,
+                merge=merge,
                 registry=self.registry,
                 cache=self.cache
             )
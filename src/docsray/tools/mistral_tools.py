@@ -1,17 +1,93 @@
 """MCP tools for Mistral AI-powered document intelligence."""
 
+import asyncio
+import contextlib
 import json
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from ..providers.base import Document
 from ..providers.registry import ProviderRegistry
 from ..utils.cache import DocumentCache
-from ..utils.documents import download_document, get_local_document, is_url
+from ..utils.documents import (
+    calculate_file_hash,
+    download_document,
+    get_local_document,
+    is_url,
+)
+from ..utils.pdf_pages import page_count as pdf_page_count
+from ..utils.pdf_pages import read_pages
 
 logger = logging.getLogger(__name__)
 
+# Bump when page text extraction or the cache entry layout changes so cached
+# pages are ignored
+_PAGE_TEXT_VERSION = "2"
+
+# Page text characters read per summary output token in handle_summarize
+_SUMMARY_CHARS_PER_TOKEN = 16
+
+# Downloads in progress, by URL
+_inflight_downloads: dict[str, asyncio.Future] = {}
+
+# Page cache reads in progress, by page cache key
+_inflight_page_reads: dict[str, asyncio.Future] = {}
+
+# Content hashes by path, with the (mtime, size) they were computed for
+_MAX_HASHED_FILES = 256
+_file_hashes: OrderedDict[Path, tuple[int, int, str]] = OrderedDict()
+_file_hashes_lock = threading.Lock()
+
+
+def _json_coercer(
+    expected_type: type, opener: str, closer: str
+) -> Callable[[str], Any]:
+    """Build the string-to-``expected_type`` coercion used by coerce_parameter.
+
+    Input not delimited like the expected JSON container is rejected up
+    front, so most malformed parameters never reach the JSON parser.
+    """
+    type_name = expected_type.__name__
+
+    def coerce(param: str) -> Any:
+        text = param.strip()
+        if not text:
+            return param
+        if text[0] != opener or text[-1] != closer:
+            logger.warning(
+                f"Failed to parse parameter as {type_name}: not a JSON {type_name}"
+            )
+            return param
+        try:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            return orjson.loads(text) if orjson is not None else json.loads(text)
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.warning(
+                f"Failed to parse parameter as {type_name}: {type(e).__name__}"
+            )
+            return param
+
+    return coerce
+
+
+_COERCERS: dict[type, Callable[[str], Any]] = {
+    dict: _json_coercer(dict, "{", "}"),
+    list: _json_coercer(list, "[", "]"),
+}
+
 
 def coerce_parameter(param: Any, expected_type: type) -> Any:
     """Convert stringified JSON parameters to their expected types.
@@ -23,15 +99,12 @@ def coerce_parameter(param: Any, expected_type: type) -> Any:
     Returns:
         The parameter converted to the expected type, or the original value if conversion fails
     """
-    if isinstance(param, str) and expected_type in (dict, list):
-        try:
-            return json.loads(param)
-        except (json.JSONDecodeError, TypeError) as e:
-            logger.warning(
-                f"Failed to parse parameter as {expected_type.__name__}: {type(e).__name__}"
-            )
-            return param
-    return param
+    if param is None or isinstance(param, expected_type):
+        return param
+    coerce = _COERCERS.get(expected_type)
+    if coerce is None or not isinstance(param, str):
+        return param
+    return coerce(param)
 
 
 async def handle_classify_pages(
@@ -39,6 +112,7 @@ async def handle_classify_pages(
     labels: list[str],
     model: Optional[str] = None,
     page_range: Optional[dict[str, int]] = None,
+    mode: str = "sync",
     registry: Optional[ProviderRegistry] = None,
     cache: Optional[DocumentCache] = None,
 ) -> dict[str, Any]:
@@ -49,6 +123,8 @@ async def handle_classify_pages(
         labels: Valid classification labels
         model: Mistral model to use (default: mistral-large-latest)
         page_range: Optional page range to classify (start, end)
+        mode: "sync" for regular requests, "batch" to run through the
+            discounted Mistral Batch API and wait for the job
         registry: Provider registry
         cache: Document cache
 
@@ -78,6 +154,15 @@ async def handle_classify_pages(
                 "suggestion": "Check DOCSRAY_MISTRAL_API_KEY is set correctly",
             }
 
+        # An empty page range needs neither the document nor the API
+        if _selects_no_pages(page_range):
+            return {
+                "labels": [],
+                "total_pages": 0,
+                "model": model or provider.config.model,
+                "provider": "mistral-ocr",
+            }
+
         # Create document object
         doc = Document(url=document_url)
 
@@ -96,20 +181,26 @@ async def handle_classify_pages(
             return {"error": "Provider is not a Mistral provider"}
 
         # Get document path
-        if is_url(document_url):
-            doc_path = await download_document(document_url)
-        else:
-            doc_path = await get_local_document(document_url)
+        doc_path = await _document_path(document_url)
 
         doc.path = doc_path
 
         # Extract text and create page samples
-        pages = await _extract_page_samples(doc_path, page_range)
+        pages = await _extract_page_samples(
+            doc_path, page_range, provider.config.pdf_workers, cache
+        )
 
         # Classify pages using Mistral
-        results = await provider.classify_pages(
-            pages=pages, labels=labels, model=model, temperature=0.0
-        )
+        if not pages:
+            results = []
+        elif mode == "batch":
+            results = await provider.classify_pages_batch(
+                pages=pages, labels=labels, model=model, temperature=0.0
+            )
+        else:
+            results = await provider.classify_pages(
+                pages=pages, labels=labels, model=model, temperature=0.0
+            )
 
         return {
             "labels": results,
@@ -128,6 +219,7 @@ async def handle_extract_fields(
     schema: dict[str, Any],
     page_filter: Optional[dict[str, Any]] = None,
     model: Optional[str] = None,
+    mode: str = "sync",
     registry: Optional[ProviderRegistry] = None,
     cache: Optional[DocumentCache] = None,
 ) -> dict[str, Any]:
@@ -138,6 +230,8 @@ async def handle_extract_fields(
         schema: Field definitions to extract
         page_filter: Optional filter for which pages to extract from
         model: Mistral model to use
+        mode: "sync" for regular requests, "batch" to run through the
+            discounted Mistral Batch API and wait for the job
         registry: Provider registry
         cache: Document cache
 
@@ -167,19 +261,27 @@ async def handle_extract_fields(
                 "suggestion": "Check DOCSRAY_MISTRAL_API_KEY is set correctly",
             }
 
+        if _selects_no_pages(page_filter):
+            return {
+                "fields": [],
+                "errors": [],
+                "total_pages_processed": 0,
+                "model": model or provider.config.model,
+                "provider": "mistral-ocr",
+            }
+
         # Create document object
         doc = Document(url=document_url)
 
         # Get document path
-        if is_url(document_url):
-            doc_path = await download_document(document_url)
-        else:
-            doc_path = await get_local_document(document_url)
+        doc_path = await _document_path(document_url)
 
         doc.path = doc_path
 
         # Extract text from pages
-        pages = await _extract_page_text(doc_path, page_filter)
+        pages = await _extract_page_text(
+            doc_path, page_filter, provider.config.pdf_workers, cache=cache
+        )
 
         # Extract fields using Mistral
         from ..providers.mistral import MistralProvider
@@ -187,9 +289,16 @@ async def handle_extract_fields(
         if not isinstance(provider, MistralProvider):
             return {"error": "Provider is not a Mistral provider"}
 
-        results = await provider.extract_fields(
-            schema=schema, inputs=pages, model=model, temperature=0.0
-        )
+        if not pages:
+            results = {"fields": [], "errors": []}
+        elif mode == "batch":
+            results = await provider.extract_fields_batch(
+                schema=schema, inputs=pages, model=model, temperature=0.0
+            )
+        else:
+            results = await provider.extract_fields(
+                schema=schema, inputs=pages, model=model, temperature=0.0
+            )
 
         return {
             "fields": results.get("fields", []),
@@ -210,6 +319,7 @@ async def handle_summarize(
     page_range: Optional[dict[str, int]] = None,
     model: Optional[str] = None,
     max_tokens: int = 512,
+    merge: bool = False,
     registry: Optional[ProviderRegistry] = None,
     cache: Optional[DocumentCache] = None,
 ) -> dict[str, Any]:
@@ -221,6 +331,7 @@ async def handle_summarize(
         page_range: Optional page range to summarize
         model: Mistral model to use
         max_tokens: Maximum tokens per summary
+        merge: Also merge the page summaries into one document summary
         registry: Provider registry
         cache: Document cache
 
@@ -246,20 +357,32 @@ async def handle_summarize(
         if not provider._initialized:
             return {"error": "Mistral provider failed to initialize"}
 
+        if _selects_no_pages(page_range):
+            result = {
+                "summaries": [],
+                "total_pages": 0,
+                "style": style,
+                "model": model or "mistral-small-latest",
+                "provider": "mistral-ocr",
+            }
+            if merge:
+                result["document_summary"] = ""
+            return result
+
         # Create document object
         doc = Document(url=document_url)
 
         # Get document path
-        if is_url(document_url):
-            doc_path = await download_document(document_url)
-        else:
-            doc_path = await get_local_document(document_url)
+        doc_path = await _document_path(document_url)
 
         doc.path = doc_path
 
-        # Extract text from pages
+        # Extract text from pages; a summary never needs more than a bounded
+        # prefix of each page, so don't read or send the rest
+        page_filter = {"range": page_range} if page_range else None
+        max_chars = max_tokens * _SUMMARY_CHARS_PER_TOKEN
         pages = await _extract_page_text(
-            doc_path, {"range": page_range} if page_range else None
+            doc_path, page_filter, provider.config.pdf_workers, max_chars, cache
         )
 
         # Summarize pages using Mistral
@@ -276,13 +399,27 @@ async def handle_summarize(
             temperature=0.3,
         )
 
-        return {
+        result = {
             "summaries": summaries,
             "total_pages": len(pages),
             "style": style,
             "model": model or "mistral-small-latest",
             "provider": "mistral-ocr",
         }
+        if merge:
+            # A failed merge must not throw away the page summaries
+            try:
+                result["document_summary"] = await provider.merge_summaries(
+                    summaries,
+                    style=style,
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=0.3,
+                )
+            except Exception as e:
+                logger.error(f"Summary merge failed: {e}")
+                result["document_summary"] = f"Error: {e}"
+        return result
 
     except Exception as e:
         logger.error(f"Summarization failed: {e}")
@@ -292,97 +429,245 @@ async def handle_summarize(
 # Helper functions
 
 
+async def _document_path(document_url: str) -> Path:
+    """Resolve a document URL or local path to a local file.
+
+    Handlers fired concurrently for the same URL (classify, extract and
+    summarize together) await a single download instead of one each.
+    """
+    if not is_url(document_url):
+        return await get_local_document(document_url)
+
+    future = _inflight_downloads.get(document_url)
+    if future is None:
+        future = asyncio.ensure_future(download_document(document_url))
+        _inflight_downloads[document_url] = future
+        future.add_done_callback(
+            lambda _: _inflight_downloads.pop(document_url, None)
+        )
+    # Shield so one cancelled handler does not cancel the others' download
+    return await asyncio.shield(future)
+
+
+def _selects_no_pages(selection: Optional[dict[str, Any]]) -> bool:
+    """Whether a page range or filter is empty regardless of the document.
+
+    Accepts a classify/summarize range ({"start", "end"}) or an extraction
+    filter ({"pages": [...]} or {"range": {...}}).
+    """
+    if not selection:
+        return False
+    if "pages" in selection:
+        return not selection["pages"]
+    page_range = selection.get("range", selection)
+    end = page_range.get("end")
+    return end is not None and (end < 1 or page_range.get("start", 1) > end)
+
+
+async def _read_document_pages(
+    cache: Optional[DocumentCache],
+    doc_path: Path,
+    select: Callable[[int], list[int]],
+    workers: int = 1,
+    max_chars: Optional[int] = None,
+) -> tuple[list[int], list[str]]:
+    """Read the pages chosen by ``select`` through the document's page cache.
+
+    One cache entry per document content (keyed by file hash, not URL) holds
+    its page count and the text of every page read so far: the full text,
+    or only the prefix a caller asked for (classification samples need just
+    70 characters). Classify, extract and summarize calls on the same
+    document therefore only read pages no earlier call has read far enough.
+    Reads of one document's entry run one at a time, so concurrent first
+    reads share the work instead of overwriting each other's pages.
+
+    Args:
+        cache: Document cache, or None to always read from the file
+        doc_path: Local path to the document
+        select: Maps the document's page count to 1-based page numbers
+        workers: Processes to spread large page selections over
+        max_chars: Optional cap on characters returned per page
+
+    Returns:
+        The selected page numbers that could be read, and their texts
+    """
+    if cache is None or not cache.enabled:
+        page_nums = select(await asyncio.to_thread(pdf_page_count, doc_path))
+        texts = await read_pages(doc_path, page_nums, workers, max_chars)
+        read = [(n, text) for n, text in zip(page_nums, texts) if text is not None]
+        return [n for n, _ in read], [text for _, text in read]
+
+    content_hash = await asyncio.to_thread(_file_hash, doc_path)
+    key = cache.generate_key(
+        content_hash, "mistral_pages", {"version": _PAGE_TEXT_VERSION}
+    )
+    # Wait for a read of this document already in progress; its pages are
+    # then in the cache. Its failure is its own caller's to report.
+    while (pending := _inflight_page_reads.get(key)) is not None:
+        with contextlib.suppress(Exception):
+            await asyncio.shield(pending)
+
+    future = asyncio.ensure_future(
+        _read_cached_pages(
+            cache, key, content_hash, doc_path, select, workers, max_chars
+        )
+    )
+    _inflight_page_reads[key] = future
+
+    def forget(done: asyncio.Future) -> None:
+        if _inflight_page_reads.get(key) is done:
+            del _inflight_page_reads[key]
+
+    future.add_done_callback(forget)
+    return await asyncio.shield(future)
+
+
+def _file_hash(doc_path: Path) -> str:
+    """Content hash of a file, reused while its mtime and size are unchanged."""
+    stat = doc_path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(doc_path)
+        if cached is not None and cached[:2] == version:
+            _file_hashes.move_to_end(doc_path)
+            return cached[2]
+
+    content_hash = calculate_file_hash(doc_path)
+    with _file_hashes_lock:
+        _file_hashes[doc_path] = (*version, content_hash)
+        _file_hashes.move_to_end(doc_path)
+        while len(_file_hashes) > _MAX_HASHED_FILES:
+            _file_hashes.popitem(last=False)
+    return content_hash
+
+
+async def _read_cached_pages(
+    cache: DocumentCache,
+    key: str,
+    content_hash: str,
+    doc_path: Path,
+    select: Callable[[int], list[int]],
+    workers: int,
+    max_chars: Optional[int],
+) -> tuple[list[int], list[str]]:
+    """Serve a page selection from one cache entry, reading what it lacks."""
+    entry = await cache.get(key)
+    if entry is None:
+        page_count = await asyncio.to_thread(pdf_page_count, doc_path)
+        # "prefixes" maps pages whose text may be cut short to the
+        # characters read; other cached texts are complete
+        entry = {"page_count": page_count, "texts": {}, "prefixes": {}}
+
+    texts, prefixes = entry["texts"], entry["prefixes"]
+
+    def cached(n: int) -> bool:
+        if n not in texts:
+            return False
+        limit = prefixes.get(n)
+        return limit is None or (max_chars is not None and limit >= max_chars)
+
+    page_nums = select(entry["page_count"])
+    missing = [n for n in dict.fromkeys(page_nums) if not cached(n)]
+    if missing:
+        read = await read_pages(doc_path, missing, workers, max_chars)
+        # Unreadable pages (None) are left out and not cached
+        failed = {n for n, text in zip(missing, read) if text is None}
+        for n, text in zip(missing, read):
+            if text is None:
+                continue
+            texts[n] = text
+            if max_chars is not None and len(text) >= max_chars:
+                prefixes[n] = max_chars
+            else:
+                prefixes.pop(n, None)
+        if len(failed) < len(missing):
+            await cache.set(key, entry, {"document_hash": content_hash})
+        page_nums = [n for n in page_nums if n not in failed]
+    return page_nums, [texts[n][:max_chars] for n in page_nums]
+
+
 async def _extract_page_samples(
-    doc_path: Path, page_range: Optional[dict[str, int]] = None
+    doc_path: Path,
+    page_range: Optional[dict[str, int]] = None,
+    workers: int = 1,
+    cache: Optional[DocumentCache] = None,
 ) -> list[dict[str, Any]]:
     """Extract text samples from document pages for classification.
 
     Args:
         doc_path: Path to document
         page_range: Optional page range (start, end)
+        workers: Processes to spread large page selections over
+        cache: Document cache shared with the other page readers
 
     Returns:
         List of page dicts with page number and text sample
     """
-    pages = []
-
-    try:
-        import fitz  # PyMuPDF
+    if fitz is None:
+        logger.error("PyMuPDF not installed. Install with: pip install pymupdf")
+        return []
 
-        pdf = fitz.open(str(doc_path))
+    def select(page_count: int) -> list[int]:
         start = page_range.get("start", 1) if page_range else 1
-        end = page_range.get("end", len(pdf)) if page_range else len(pdf)
-
-        for page_num in range(start - 1, end):  # PyMuPDF uses 0-based indexing
-            if page_num >= len(pdf):
-                break
-
-            page = pdf[page_num]
-            text = page.get_text()
-
-            # Take first 70 characters as sample for classification
-            text_sample = text[:70].strip() if text else ""
-
-            pages.append(
-                {
-                    "page": page_num + 1,  # 1-based for user-facing output
-                    "textSample": text_sample,
-                }
-            )
-
-        pdf.close()
+        end = page_range.get("end", page_count) if page_range else page_count
+        return list(range(max(start, 1), min(end, page_count) + 1))
 
+    try:
+        # Take first 70 characters as sample for classification
+        page_nums, texts = await _read_document_pages(
+            cache, doc_path, select, workers, max_chars=70
+        )
     except Exception as e:
         logger.error(f"Failed to extract page samples: {e}")
+        return []
 
-    return pages
+    return [
+        {"page": page_num, "textSample": text.strip() if text else ""}
+        for page_num, text in zip(page_nums, texts)
+    ]
 
 
 async def _extract_page_text(
-    doc_path: Path, page_filter: Optional[dict[str, Any]] = None
+    doc_path: Path,
+    page_filter: Optional[dict[str, Any]] = None,
+    workers: int = 1,
+    max_chars: Optional[int] = None,
+    cache: Optional[DocumentCache] = None,
 ) -> list[dict[str, Any]]:
     """Extract full text from document pages.
 
     Args:
         doc_path: Path to document
         page_filter: Optional filter (pages list or range)
+        workers: Processes to spread large page selections over
+        max_chars: Optional cap on characters kept per page
+        cache: Document cache shared with the other page readers
 
     Returns:
-        List of page dicts with page number and full text
+        List of page dicts with page number and (possibly truncated) text
     """
-    pages = []
-
-    try:
-        import fitz  # PyMuPDF
-
-        pdf = fitz.open(str(doc_path))
-
-        # Determine which pages to extract
-        if page_filter:
-            if "pages" in page_filter:
-                page_nums = page_filter["pages"]
-            elif "range" in page_filter:
-                page_range = page_filter["range"]
-                start = page_range.get("start", 1)
-                end = page_range.get("end", len(pdf))
-                page_nums = list(range(start, end + 1))
-            else:
-                page_nums = list(range(1, len(pdf) + 1))
+    if fitz is None:
+        logger.error("PyMuPDF not installed. Install with: pip install pymupdf")
+        return []
+
+    def select(page_count: int) -> list[int]:
+        if page_filter and "pages" in page_filter:
+            page_nums = page_filter["pages"]
+        elif page_filter and "range" in page_filter:
+            page_range = page_filter["range"]
+            start = page_range.get("start", 1)
+            end = page_range.get("end", page_count)
+            page_nums = list(range(start, end + 1))
         else:
-            page_nums = list(range(1, len(pdf) + 1))
-
-        for page_num in page_nums:
-            if page_num < 1 or page_num > len(pdf):
-                continue
-
-            page = pdf[page_num - 1]  # PyMuPDF uses 0-based indexing
-            text = page.get_text()
-
-            pages.append({"page": page_num, "text": text})
-
-        pdf.close()
+            page_nums = list(range(1, page_count + 1))
+        return [n for n in page_nums if 1 <= n <= page_count]
 
+    try:
+        page_nums, texts = await _read_document_pages(
+            cache, doc_path, select, workers, max_chars
+        )
     except Exception as e:
         logger.error(f"Failed to extract page text: {e}")
+        return []
 
-    return pages
+    return [{"page": n, "text": text} for n, text in zip(page_nums, texts)]
@@ -0,0 +1,95 @@
+"""Short-window coalescing of concurrent requests into shared batches.
+
+Items submitted under the same key within ``window`` seconds of each other
+are handed to a single handler call, and each submitter gets back the
+results for its own items. This trades a few milliseconds of latency for
+fewer, larger upstream requests when many small requests arrive together.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Hashable, list[Any]], Awaitable[list[Any]]]
+
+
+class RequestCoalescer:
+    """Merge items submitted concurrently under the same key."""
+
+    def __init__(
+        self, handler: Handler, window: float = 0.02, max_batch_size: int = 16
+    ):
+        """Initialize the coalescer.
+
+        Args:
+            handler: Coroutine called with a key and the merged items; must
+                return one result per item, in order
+            window: Seconds to wait for more items after the first arrives
+            max_batch_size: Flush early once this many items are pending
+        """
+        self.handler = handler
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: dict[Hashable, list[tuple[list[Any], asyncio.Future]]] = {}
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+        # The loop only keeps weak references to tasks, so flushes in
+        # progress are held here until they finish
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, items: list[Any]) -> list[Any]:
+        """Queue ``items`` under ``key`` and wait for their results."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((items, future))
+
+        if sum(len(entry[0]) for entry in pending) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        entries = self._pending.pop(key, None)
+        if entries:
+            task = asyncio.ensure_future(self._run(key, entries))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, key: Hashable, entries: list[tuple[list[Any], asyncio.Future]]
+    ) -> None:
+        merged = [item for items, _ in entries for item in items]
+        if len(entries) > 1:
+            logger.debug(f"Coalesced {len(entries)} requests ({len(merged)} items)")
+
+        try:
+            results = await self.handler(key, merged)
+            if len(results) != len(merged):
+                raise ValueError(
+                    f"Coalesced handler returned {len(results)} results "
+                    f"for {len(merged)} items"
+                )
+        except asyncio.CancelledError:
+            # The flush itself was cancelled; no waiter may be left hanging
+            for _, future in entries:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for items, future in entries:
+            if not future.done():
+                future.set_result(results[offset : offset + len(items)])
+            offset += len(items)
@@ -1,5 +1,6 @@
 """Document handling utilities."""
 
+import functools
 import hashlib
 import logging
 import mimetypes
@@ -14,6 +15,9 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+# Read size for file hashing
+HASH_CHUNK_SIZE = 1024 * 1024
+
 # Document format mappings
 FORMAT_EXTENSIONS = {
     ".pdf": "pdf",
@@ -43,6 +47,7 @@ MIME_TO_FORMAT = {
 }
 
 
+@functools.lru_cache(maxsize=1024)
 def get_document_format(url_or_path: str) -> Optional[str]:
     """Determine document format from URL or path.
     
@@ -127,9 +132,13 @@ def calculate_file_hash(file_path: Path, algorithm: str = "sha256") -> str:
     """
     hasher = hashlib.new(algorithm)
 
-    with open(file_path, "rb") as f:
-        while chunk := f.read(8192):
-            hasher.update(chunk)
+    # Large chunks read into one reused buffer: hashlib releases the GIL for
+    # big updates, and OpenSSL uses SHA extensions where the CPU has them
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while size := f.readinto(buffer):
+            hasher.update(view[:size])
 
     return hasher.hexdigest()
 
@@ -0,0 +1,190 @@
+"""Per-page PDF text reading, optionally spread over worker processes.
+
+PyMuPDF is not thread-safe, so each open document handle is used by one
+thread at a time under its own lock. Handles are kept in a small LRU keyed
+by path and invalidated when the file's mtime or size changes, so the
+classify/extract/summarize sequence parses a PDF once. Large page
+selections are split into contiguous slices read by separate processes,
+each with its own handles. This module is kept free of heavy imports
+because spawned workers import it.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+logger = logging.getLogger(__name__)
+
+# Page selections at least this long are read by a process pool
+PARALLEL_MIN_PAGES = 64
+
+# Open document handles kept per process
+MAX_OPEN_DOCUMENTS = 8
+
+_pools: dict[int, ProcessPoolExecutor] = {}
+_handles: OrderedDict[str, tuple[tuple[int, int], Any, threading.Lock]] = OrderedDict()
+_handles_lock = threading.Lock()
+
+
+@contextmanager
+def open_document(doc_path: str) -> Iterator[Any]:
+    """Yield a shared handle for a PDF, held exclusively for the block."""
+    while True:
+        entry = _current_handle(doc_path)
+        _, pdf, lock = entry
+        with lock:
+            # The entry may have been evicted (and closed) between looking
+            # it up and taking its lock; eviction closes under this lock, so
+            # once the entry is still current here it stays open
+            with _handles_lock:
+                current = _handles.get(doc_path) is entry
+            if current:
+                yield pdf
+                return
+
+
+def _current_handle(doc_path: str) -> tuple[tuple[int, int], Any, threading.Lock]:
+    """The cached entry for a PDF, opening it if missing or out of date."""
+    stat = os.stat(doc_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    with _handles_lock:
+        entry = _handles.get(doc_path)
+        if entry is not None and entry[0] == version:
+            _handles.move_to_end(doc_path)
+            return entry
+
+    pdf = fitz.open(doc_path)
+    with _handles_lock:
+        stale = _handles.pop(doc_path, None)
+        entry = (version, pdf, threading.Lock())
+        _handles[doc_path] = entry
+        evicted = [stale] if stale is not None else []
+        while len(_handles) > MAX_OPEN_DOCUMENTS:
+            evicted.append(_handles.popitem(last=False)[1])
+    for _, old, lock in evicted:
+        # Wait for any reader still using the handle before closing it
+        with lock:
+            old.close()
+    return entry
+
+
+def close_documents() -> None:
+    """Close all shared document handles."""
+    with _handles_lock:
+        entries = list(_handles.values())
+        _handles.clear()
+    for _, pdf, lock in entries:
+        with lock:
+            pdf.close()
+
+
+def page_count(doc_path: Path) -> int:
+    """Number of pages in a PDF (blocking)."""
+    with open_document(str(doc_path)) as pdf:
+        return len(pdf)
+
+
+def read_page_texts(
+    doc_path: str, page_nums: list[int], max_chars: Optional[int] = None
+) -> list[Optional[str]]:
+    """Text of the given 1-based pages from one document handle (blocking).
+
+    Texts are cut to ``max_chars`` here, inside the (possibly separate)
+    worker, so only the needed prefix is sent back to the caller. A page
+    that fails to read is logged and returned as None, so one bad page does
+    not lose the others.
+    """
+    texts: list[Optional[str]] = []
+    with open_document(doc_path) as pdf:
+        for n in page_nums:
+            try:
+                # load_page is 0-based; it is also what pdf[i] calls
+                texts.append(_page_text(pdf.load_page(n - 1))[:max_chars])
+            except Exception as e:
+                logger.warning(f"Failed to read page {n} of {doc_path}: {e}")
+                texts.append(None)
+    return texts
+
+
+def _page_text(page: Any) -> str:
+    # Same output as page.get_text(), with the flags pinned and the TextPage
+    # released as soon as its text is read
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+    text = textpage.extractText()
+    del textpage
+    return text
+
+
+async def read_pages(
+    doc_path: Path,
+    page_nums: list[int],
+    workers: int = 1,
+    max_chars: Optional[int] = None,
+) -> list[Optional[str]]:
+    """Read the text of 1-based ``page_nums`` without blocking the event loop.
+
+    Args:
+        doc_path: Path to the PDF
+        page_nums: Valid 1-based page numbers, in the order to return them
+        workers: Processes to spread selections of PARALLEL_MIN_PAGES or
+            more pages over (capped at the CPU count); 1 reads sequentially
+            in a worker thread
+        max_chars: Cut each page's text to this many characters
+
+    Returns:
+        Page texts in the order of ``page_nums``, None for unreadable pages
+    """
+    workers = min(workers, os.cpu_count() or 1)
+    if workers < 2 or len(page_nums) < PARALLEL_MIN_PAGES:
+        return await asyncio.to_thread(
+            read_page_texts, str(doc_path), page_nums, max_chars
+        )
+
+    loop = asyncio.get_running_loop()
+    pool = _pool(workers)
+    size = -(-len(page_nums) // workers)
+    parts = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                pool,
+                read_page_texts,
+                str(doc_path),
+                page_nums[i : i + size],
+                max_chars,
+            )
+            for i in range(0, len(page_nums), size)
+        )
+    )
+    return [text for part in parts for text in part]
+
+
+def shutdown_pools() -> None:
+    """Shut down the worker process pools, cancelling queued reads."""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        # Spawned workers avoid forking the event loop and open handles
+        pool = _pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return pool
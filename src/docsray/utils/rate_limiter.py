@@ -0,0 +1,103 @@
+"""Client-side request and token rate limiting for remote AI APIs.
+
+Requests are admitted against a sliding one-minute window. The request
+limit adapts AIMD-style: it is halved whenever the server reports rate
+limiting and recovers by one request per successful call, up to the
+configured ceiling.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Sliding-window limiter for requests and tokens per minute."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        window: float = 60.0,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request ceiling, or None for no limit
+            tokens_per_minute: Token ceiling, or None for no limit
+            window: Window length in seconds
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._request_limit = requests_per_minute
+        self._events: deque[tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is configured."""
+        return bool(self.requests_per_minute or self.tokens_per_minute)
+
+    @property
+    def request_limit(self) -> Optional[int]:
+        """Current (adapted) requests-per-window limit."""
+        return self._request_limit
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until a request costing ``tokens`` fits in the window."""
+        if not self.enabled:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    break
+                logger.debug(f"Rate limit reached; waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+
+            self._events.append((now, tokens))
+            self._tokens_in_window += tokens
+
+    def on_success(self) -> None:
+        """Additively raise the request limit back toward its ceiling."""
+        if self._request_limit is not None and self.requests_per_minute:
+            self._request_limit = min(self.requests_per_minute, self._request_limit + 1)
+
+    def on_rate_limited(self) -> None:
+        """Multiplicatively cut the request limit after a 429."""
+        if self._request_limit is not None:
+            self._request_limit = max(1, self._request_limit // 2)
+            logger.info(f"Rate limited; request limit now {self._request_limit}/min")
+
+    def _expire(self, now: float) -> None:
+        while self._events and self._events[0][0] <= now - self.window:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        wait = 0.0
+
+        if self._request_limit is not None and len(self._events) >= self._request_limit:
+            # The oldest requests must leave the window to make room
+            oldest = self._events[len(self._events) - self._request_limit]
+            wait = max(wait, oldest[0] + self.window - now)
+
+        if self.tokens_per_minute and self._events:
+            excess = self._tokens_in_window + tokens - self.tokens_per_minute
+            # A request larger than the whole budget runs in an empty window
+            for timestamp, event_tokens in self._events:
+                if excess <= 0:
+                    break
+                excess -= event_tokens
+                wait = max(wait, timestamp + self.window - now)
+
+        return wait
@@ -0,0 +1,177 @@
+"""Response caching for LLM calls.
+
+Two lookup tiers are supported:
+
+1. Exact match on a SHA-256 key built from the full request (O(1)).
+2. Semantic match on an embedding of the request content, returning a
+   stored response when cosine similarity reaches the configured threshold.
+
+The semantic tier requires numpy and is skipped when it is unavailable. It
+is a brute-force scan: one matrix-vector product over a namespace's
+normalized vectors. With at most ``max_entries`` (1024 by default) vectors
+that is well under a millisecond, cheaper than building and maintaining an
+ANN index such as HNSW, and exact rather than approximate.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with the remote-ai extras
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with the ai extras
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """In-memory two-tier (exact + embedding similarity) response cache."""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1024):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._exact: OrderedDict[str, Any] = OrderedDict()
+        # Per-namespace embedding index: (normalized vectors, exact keys)
+        self._vectors: dict[str, Any] = {}
+        self._vector_keys: dict[str, list[str]] = {}
+        self.stats = {
+            "exact_hits": 0,
+            "exact_misses": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+        }
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable SHA-256 key from JSON-serializable request parts."""
+        if orjson is not None:
+            payload = orjson.dumps(
+                parts,
+                default=str,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            )
+        else:
+            payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    @property
+    def semantic_available(self) -> bool:
+        """Whether the embedding tier can be used."""
+        return np is not None
+
+    def get_exact(self, key: str) -> Optional[Any]:
+        """Look up a response by exact request key."""
+        value = self._exact.get(key)
+        if value is None:
+            self.stats["exact_misses"] += 1
+            return None
+        self._exact.move_to_end(key)
+        self.stats["exact_hits"] += 1
+        return value
+
+    def get(
+        self,
+        namespace: str,
+        embedding: Sequence[float],
+        threshold: Optional[float] = None,
+    ) -> Optional[Any]:
+        """Look up the nearest stored response within a namespace.
+
+        Args:
+            namespace: Partition key (e.g. model + system prompt), so only
+                requests with identical instructions can match each other
+            embedding: Embedding of the request content
+            threshold: Minimum cosine similarity (default: instance threshold)
+
+        Returns:
+            Cached response, or None when no neighbor is close enough
+        """
+        matrix = self._vectors.get(namespace)
+        if matrix is None or not self.semantic_available:
+            self.stats["misses"] += 1
+            return None
+
+        query = self._normalize(embedding)
+        scores = matrix @ query
+        best = int(scores.argmax())
+        if float(scores[best]) < (
+            threshold if threshold is not None else self.threshold
+        ):
+            self.stats["misses"] += 1
+            return None
+
+        key = self._vector_keys[namespace][best]
+        value = self._exact.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._exact.move_to_end(key)
+        self.stats["semantic_hits"] += 1
+        logger.debug(f"Semantic cache hit (similarity={float(scores[best]):.3f})")
+        return value
+
+    def put(
+        self,
+        key: str,
+        response: Any,
+        namespace: Optional[str] = None,
+        embedding: Optional[Sequence[float]] = None,
+    ) -> None:
+        """Store a response under its exact key and, optionally, its embedding.
+
+        Storing a key again replaces its response and its embedding.
+        """
+        if key in self._exact:
+            self._forget_vector(key)
+        self._exact[key] = response
+        self._exact.move_to_end(key)
+
+        if namespace is not None and embedding is not None and self.semantic_available:
+            vector = self._normalize(embedding)[None, :]
+            matrix = self._vectors.get(namespace)
+            if matrix is None or matrix.shape[1] != vector.shape[1]:
+                self._vectors[namespace] = vector
+                self._vector_keys[namespace] = [key]
+            else:
+                self._vectors[namespace] = np.vstack([matrix, vector])
+                self._vector_keys[namespace].append(key)
+
+        while len(self._exact) > self.max_entries:
+            evicted, _ = self._exact.popitem(last=False)
+            self._forget_vector(evicted)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._exact.clear()
+        self._vectors.clear()
+        self._vector_keys.clear()
+
+    def _forget_vector(self, key: str) -> None:
+        for namespace, keys in list(self._vector_keys.items()):
+            if key not in keys:
+                continue
+            idx = keys.index(key)
+            keys.pop(idx)
+            if keys:
+                self._vectors[namespace] = np.delete(
+                    self._vectors[namespace], idx, axis=0
+                )
+            else:
+                del self._vectors[namespace]
+                del self._vector_keys[namespace]
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Any:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
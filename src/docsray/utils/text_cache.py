@@ -0,0 +1,93 @@
+"""On-disk cache of extracted document text.
+
+Entries are keyed by the SHA-256 of the document bytes, so the same file
+processed by several operations (peek, xray, extract) is parsed only once.
+All methods are blocking; async callers should run them in a worker thread.
+"""
+
+import contextlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractedTextCache:
+    """Content-hash keyed text cache with LRU eviction by access time."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_entries: int = 256,
+        version: str = "1",
+    ):
+        """Initialize the text cache.
+
+        Args:
+            cache_dir: Directory for cached text. Defaults to ~/.docsray/cache/text
+            max_entries: Maximum number of cached documents
+            version: Extractor version; bump it when extraction output changes
+        """
+        self.cache_dir = cache_dir or Path.home() / ".docsray" / "cache" / "text"
+        self.max_entries = max_entries
+        self.version = version
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"{content_hash}.v{self.version}.txt"
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Return cached text for a document hash, or None on miss."""
+        path = self._entry_path(content_hash)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read text cache entry {path}: {e}")
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return text
+
+    def put(self, content_hash: str, text: str) -> None:
+        """Store extracted text atomically, then evict old entries."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.cache_dir,
+                prefix=".tmp_",
+                suffix=".txt",
+                delete=False,
+            ) as tmp:
+                tmp.write(text)
+            os.replace(tmp.name, self._entry_path(content_hash))
+        except OSError as e:
+            logger.warning(f"Failed to write text cache entry: {e}")
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.txt"):
+            if path.name.startswith(".tmp_"):
+                continue
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return
+
+        for _, path in sorted(entries)[:excess]:
+            with contextlib.suppress(OSError):
+                path.unlink()
@@ -1,6 +1,5 @@
 """Pytest configuration and fixtures."""
 
-import asyncio
 import tempfile
 from pathlib import Path
 from typing import AsyncGenerator, Generator
@@ -15,14 +14,6 @@ from docsray.server import DocsrayServer
 from docsray.utils.cache import DocumentCache
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest.fixture
 def test_config() -> DocsrayConfig:
     """Create test configuration."""
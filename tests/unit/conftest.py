@@ -0,0 +1,88 @@
+"""Shared fixtures for Mistral provider and tool unit tests.
+
+The docsray modules are imported inside the fixtures, so collecting test
+modules that never use them does not pay for the Mistral SDK import.
+"""
+
+from unittest.mock import MagicMock, create_autospec, patch
+
+import pytest
+
+
+@pytest.fixture
+def mock_mistral_class():
+    """Patch the Mistral SDK client class used by the provider."""
+    from docsray.providers import mistral as _mistral
+
+    with patch.object(_mistral, "Mistral") as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_download():
+    """Patch document downloads in the Mistral tool handlers."""
+    from docsray.tools import mistral_tools as _mt
+
+    with patch.object(_mt, "download_document") as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_local_document():
+    """Patch local document resolution in the Mistral tool handlers."""
+    from docsray.tools import mistral_tools as _mt
+
+    with patch.object(_mt, "get_local_document") as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_registry():
+    """Registry whose "mistral-ocr" provider is an initialized provider mock.
+
+    The mock is autospecced on MistralProvider, so it passes the handlers'
+    isinstance checks, its coroutine methods are AsyncMocks and calls are
+    checked against the real signatures.
+
+    Returns:
+        Tuple of (registry, provider)
+    """
+    from docsray.config import MistralOCRConfig
+    from docsray.providers.mistral import MistralProvider
+
+    provider = create_autospec(MistralProvider, instance=True)
+    provider._initialized = True
+    provider.config = MistralOCRConfig(model="pixtral-12b-2409", pdf_workers=1)
+    registry = MagicMock()
+    registry.get_provider.return_value = provider
+    return registry, provider
+
+
+@pytest.fixture
+def mock_pdf(tmp_path, mock_local_document):
+    """A 10-page mock PDF that "test.pdf" resolves to in the tool handlers.
+
+    Set ``__len__.return_value`` for another page count, or the page's
+    extracted text via ``mock_pdf.page_text``.
+    """
+    from docsray.utils import pdf_pages as _pdf_pages
+
+    doc_path = tmp_path / "test.pdf"
+    doc_path.write_bytes(b"%PDF-1.4 test")
+    mock_local_document.return_value = doc_path
+
+    # Specced to what pdf_pages touches, so stray attribute access fails
+    # loudly instead of growing the mock tree
+    pdf = MagicMock(spec=["load_page", "close", "__len__"])
+    page = MagicMock(spec=["get_textpage"])
+    textpage = MagicMock(spec=["extractText"])
+    textpage.extractText.side_effect = lambda: pdf.page_text
+    page.get_textpage.return_value = textpage
+    pdf.page_text = "Sample text"
+    pdf.load_page.return_value = page
+    pdf.__len__.return_value = 10
+
+    with patch.object(_pdf_pages, "fitz", spec=["open", "TEXTFLAGS_TEXT"]) as mock_fitz:
+        mock_fitz.open.return_value = pdf
+        yield pdf
+    _pdf_pages.close_documents()
@@ -1,18 +1,52 @@
 """Unit tests for Mistral AI provider."""
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
 from docsray.config import MistralOCRConfig
 from docsray.providers.base import Document
-from docsray.providers.mistral import MistralProvider
+from docsray.providers.mistral import (
+    MistralProvider,
+    _extract_pdf_text,
+    _fast_classification,
+    _fast_extraction,
+    _http_limits,
+    _truncate_to_tokens,
+)
+from docsray.utils import pdf_pages
+from docsray.utils.coalescer import RequestCoalescer
+from docsray.utils.semantic_cache import SemanticCache
+
+# Canned completion bodies, serialized once at import
+_CLASSIFY_PAYLOAD = json.dumps(
+    [
+        {"page": 1, "label": "income_statement", "confidence": 0.95},
+        {"page": 2, "label": "balance_sheet", "confidence": 0.92},
+    ]
+)
+_EXTRACT_PAYLOAD = json.dumps(
+    {
+        "fields": [
+            {
+                "name": "total_revenue",
+                "value": 1000000,
+                "confidence": 0.98,
+                "source": {"page": 1},
+            }
+        ],
+        "errors": [],
+    }
+)
+_SUMMARY_PAYLOAD = "• Key finding 1\n• Key finding 2\n• Key finding 3"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mistral_config():
-    """Create test Mistral configuration."""
+    """Create test Mistral configuration (read-only, so shared)."""
     return MistralOCRConfig(
         enabled=True,
         api_key="test-api-key",
@@ -27,7 +61,60 @@ def mistral_provider():
     return MistralProvider()
 
 
-@pytest.mark.asyncio
+def _chat_response(content):
+    """Build a chat completion response mock carrying one message."""
+    message = MagicMock()
+    message.content = content
+    choice = MagicMock()
+    choice.message = message
+    response = MagicMock()
+    response.choices = [choice]
+    return response
+
+
+def _async_return(value):
+    """Build a coroutine function that always returns ``value``."""
+
+    async def _return(*_args, **_kwargs):
+        return value
+
+    return _return
+
+
+def _batch_output_line(custom_id, content):
+    """Build one line of a Batch API output file for a JSON completion."""
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "id": f"cmpl-{custom_id}",
+                    "object": "chat.completion",
+                    "model": "mistral-large-latest",
+                    "created": 0,
+                    "usage": {
+                        "prompt_tokens": 1,
+                        "completion_tokens": 1,
+                        "total_tokens": 2,
+                    },
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {
+                                "role": "assistant",
+                                "content": json.dumps(content),
+                            },
+                        }
+                    ],
+                },
+            },
+            "error": None,
+        }
+    )
+
+
 class TestMistralProvider:
     """Test suite for MistralProvider."""
 
@@ -51,19 +138,26 @@ class TestMistralProvider:
         assert caps.features["summarization"] is True
         assert caps.features["semanticSearch"] is True
 
-    async def test_initialize_success(self, mistral_provider, mistral_config):
+    async def test_initialize_success(
+        self, mistral_provider, mistral_config, mock_mistral_class
+    ):
         """Test successful provider initialization."""
-        with patch("docsray.providers.mistral.Mistral") as mock_mistral:
-            mock_client = MagicMock()
-            mock_mistral.return_value = mock_client
+        mock_client = MagicMock()
+        mock_mistral_class.return_value = mock_client
 
-            await mistral_provider.initialize(mistral_config)
+        await mistral_provider.initialize(mistral_config)
 
-            assert mistral_provider._initialized is True
-            assert mistral_provider._client is not None
-            mock_mistral.assert_called_once_with(
-                api_key="test-api-key", server_url="https://api.mistral.ai"
-            )
+        assert mistral_provider._initialized is True
+        assert mistral_provider._client is not None
+        mock_mistral_class.assert_called_once_with(
+            api_key="test-api-key",
+            server_url="https://api.mistral.ai",
+            async_client=mistral_provider._http_client,
+        )
+        assert mistral_provider._http_client is not None
+
+        await mistral_provider.dispose()
+        assert mistral_provider._http_client is None
 
     async def test_initialize_no_api_key(self, mistral_provider):
         """Test initialization with no API key."""
@@ -79,146 +173,798 @@ class TestMistralProvider:
 
         assert mistral_provider._initialized is False
 
+    @pytest.mark.usefixtures("mock_mistral_class")
     async def test_can_process_valid_document(self, mistral_provider, mistral_config):
         """Test can_process with valid document."""
-        with patch("docsray.providers.mistral.Mistral"):
-            await mistral_provider.initialize(mistral_config)
+        await mistral_provider.initialize(mistral_config)
 
-            doc = Document(url="test.pdf", format="pdf", size=50 * 1024 * 1024)  # 50MB
+        doc = Document(url="test.pdf", format="pdf", size=50 * 1024 * 1024)  # 50MB
 
-            result = await mistral_provider.can_process(doc)
-            assert result is True
+        result = await mistral_provider.can_process(doc)
+        assert result is True
 
+    @pytest.mark.usefixtures("mock_mistral_class")
     async def test_can_process_unsupported_format(
         self, mistral_provider, mistral_config
     ):
         """Test can_process with unsupported format."""
-        with patch("docsray.providers.mistral.Mistral"):
-            await mistral_provider.initialize(mistral_config)
+        await mistral_provider.initialize(mistral_config)
+
+        doc = Document(url="test.xlsx", format="xlsx", size=10 * 1024 * 1024)
 
-            doc = Document(url="test.xlsx", format="xlsx", size=10 * 1024 * 1024)
+        result = await mistral_provider.can_process(doc)
+        assert result is False
+
+    async def test_can_process_sniffs_format_without_modifying_document(
+        self, mistral_provider
+    ):
+        """Test the sniffed format is memoized by the provider, not the document."""
+        mistral_provider._initialized = True
+        mistral_provider._client = MagicMock()
+        doc = Document(url="https://example.com/report.pdf")
 
-            result = await mistral_provider.can_process(doc)
-            assert result is False
+        with patch(
+            "docsray.providers.mistral.get_document_format", return_value="pdf"
+        ) as sniff:
+            assert await mistral_provider.can_process(doc) is True
+            assert await mistral_provider.can_process(doc) is True
 
+        sniff.assert_called_once_with("https://example.com/report.pdf")
+        assert doc.format is None
+
+    @pytest.mark.usefixtures("mock_mistral_class")
     async def test_can_process_too_large(self, mistral_provider, mistral_config):
         """Test can_process with file too large."""
-        with patch("docsray.providers.mistral.Mistral"):
-            await mistral_provider.initialize(mistral_config)
+        await mistral_provider.initialize(mistral_config)
 
-            doc = Document(
-                url="test.pdf",
-                format="pdf",
-                size=200 * 1024 * 1024,  # 200MB, over 100MB limit
-            )
+        doc = Document(
+            url="test.pdf",
+            format="pdf",
+            size=200 * 1024 * 1024,  # 200MB, over 100MB limit
+        )
 
-            result = await mistral_provider.can_process(doc)
-            assert result is False
+        result = await mistral_provider.can_process(doc)
+        assert result is False
 
-    async def test_classify_pages_success(self, mistral_provider, mistral_config):
+    async def test_classify_pages_success(
+        self, mistral_provider, mistral_config, mock_mistral_class
+    ):
         """Test successful page classification."""
-        with patch("docsray.providers.mistral.Mistral") as mock_mistral:
-            # Setup mock client
-            mock_client = MagicMock()
-            mock_mistral.return_value = mock_client
-
-            # Setup mock response
-            mock_response = MagicMock()
-            mock_choice = MagicMock()
-            mock_message = MagicMock()
-            mock_message.content = json.dumps(
-                [
-                    {"page": 1, "label": "income_statement", "confidence": 0.95},
-                    {"page": 2, "label": "balance_sheet", "confidence": 0.92},
-                ]
-            )
-            mock_choice.message = mock_message
-            mock_response.choices = [mock_choice]
+        # Setup mock client
+        mock_client = MagicMock()
+        mock_mistral_class.return_value = mock_client
 
-            mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        # Setup mock response
+        mock_response = _chat_response(_CLASSIFY_PAYLOAD)
 
-            await mistral_provider.initialize(mistral_config)
+        mock_client.chat.complete_async = _async_return(mock_response)
 
-            pages = [
-                {"page": 1, "textSample": "Income Statement for Year..."},
-                {"page": 2, "textSample": "Balance Sheet as of..."},
-            ]
-            labels = ["income_statement", "balance_sheet", "notes"]
+        await mistral_provider.initialize(mistral_config)
+
+        pages = [
+            {"page": 1, "textSample": "Income Statement for Year..."},
+            {"page": 2, "textSample": "Balance Sheet as of..."},
+        ]
+        labels = ["income_statement", "balance_sheet", "notes"]
+
+        result = await mistral_provider.classify_pages(pages, labels)
+
+        assert len(result) == 2
+        assert result[0]["page"] == 1
+        assert result[0]["label"] == "income_statement"
+        assert result[0]["confidence"] == 0.95
+
+    async def test_stream_classify_pages_yields_items_incrementally(
+        self, mistral_provider
+    ):
+        """Test streamed labels are yielded as each array item completes."""
+        deltas = [
+            '{"labels": [{"page": 1, "label": "no',
+            'tes", "confidence": 0.8}, {"page": 2, "label": "bogus", ',
+            '"confidence": 0.5}, {"page": 3, "label": "other", "confidence": 1}',
+            "]}",
+        ]
 
-            result = await mistral_provider.classify_pages(pages, labels)
+        async def stream():
+            for delta in deltas:
+                event = MagicMock()
+                event.data.choices = [MagicMock()]
+                event.data.choices[0].delta.content = delta
+                yield event
+
+        mock_client = MagicMock()
+        mock_client.chat.stream_async = AsyncMock(return_value=stream())
+        mistral_provider._client = mock_client
+
+        items = [
+            item
+            async for item in mistral_provider.stream_classify_pages(
+                [{"page": 1, "textSample": "Notes"}], ["notes"]
+            )
+        ]
 
-            assert len(result) == 2
-            assert result[0]["page"] == 1
-            assert result[0]["label"] == "income_statement"
-            assert result[0]["confidence"] == 0.95
+        assert items == [
+            {"page": 1, "label": "notes", "confidence": 0.8},
+            {"page": 3, "label": "other", "confidence": 1},
+        ]
 
-    async def test_extract_fields_success(self, mistral_provider, mistral_config):
+    async def test_stream_classify_pages_releases_slot_for_slow_consumer(
+        self, mistral_provider
+    ):
+        """Test the request slot is not held while the consumer is suspended."""
+        release = asyncio.Event()
+
+        async def stream():
+            for page in (1, 2):
+                event = MagicMock()
+                event.data.choices = [MagicMock()]
+                event.data.choices[0].delta.content = (
+                    '{"labels": [' if page == 1 else ", "
+                ) + json.dumps({"page": page, "label": "notes", "confidence": 1})
+                yield event
+            await release.wait()
+
+        mock_client = MagicMock()
+        mock_client.chat.stream_async = AsyncMock(return_value=stream())
+        mistral_provider._client = mock_client
+
+        items = mistral_provider.stream_classify_pages(
+            [{"page": 1, "textSample": "Notes"}], ["notes"]
+        )
+        assert (await items.__anext__())["page"] == 1
+        with pytest.raises(ValueError):
+            await items.athrow(ValueError("consumer failed"))
+        await asyncio.sleep(0)
+
+        assert mistral_provider.request_stats["in_flight"] == 0
+
+    async def test_extract_fields_success(
+        self, mistral_provider, mistral_config, mock_mistral_class
+    ):
         """Test successful field extraction."""
-        with patch("docsray.providers.mistral.Mistral") as mock_mistral:
-            # Setup mock client
-            mock_client = MagicMock()
-            mock_mistral.return_value = mock_client
-
-            # Setup mock response
-            mock_response = MagicMock()
-            mock_choice = MagicMock()
-            mock_message = MagicMock()
-            mock_message.content = json.dumps(
+        # Setup mock client
+        mock_client = MagicMock()
+        mock_mistral_class.return_value = mock_client
+
+        # Setup mock response
+        mock_response = _chat_response(_EXTRACT_PAYLOAD)
+
+        mock_client.chat.complete_async = _async_return(mock_response)
+
+        await mistral_provider.initialize(mistral_config)
+
+        schema = {"fields": [{"name": "total_revenue", "type": "currency"}]}
+        inputs = [{"page": 1, "text": "Total Revenue: $1,000,000"}]
+
+        result = await mistral_provider.extract_fields(schema, inputs)
+
+        assert len(result["fields"]) == 1
+        assert result["fields"][0]["name"] == "total_revenue"
+        assert result["fields"][0]["value"] == 1000000
+        assert result["fields"][0]["confidence"] == 0.98
+
+    async def test_analyze_pages_single_request(self, mistral_provider):
+        """Test classification and extraction share one request."""
+        field = {"name": "total", "value": 10, "confidence": 0.9, "source": {}}
+        mock_response = _chat_response(
+            json.dumps(
                 {
-                    "fields": [
-                        {
-                            "name": "total_revenue",
-                            "value": 1000000,
-                            "confidence": 0.98,
-                            "source": {"page": 1},
-                        }
-                    ],
+                    "labels": [{"page": 1, "label": "notes", "confidence": 0.8}],
+                    "fields": [field],
                     "errors": [],
                 }
             )
-            mock_choice.message = mock_message
-            mock_response.choices = [mock_choice]
+        )
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+
+        result = await mistral_provider.analyze_pages(
+            [{"page": 1, "text": "Total: 10"}],
+            ["notes"],
+            {"fields": [{"name": "total", "type": "currency"}]},
+        )
 
-            mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        assert result == {
+            "labels": [{"page": 1, "label": "notes", "confidence": 0.8}],
+            "fields": [field],
+        }
+        assert mock_client.chat.complete_async.await_count == 1
 
-            await mistral_provider.initialize(mistral_config)
+    async def test_summarize_pages_success(
+        self, mistral_provider, mistral_config, mock_mistral_class
+    ):
+        """Test successful page summarization."""
+        # Setup mock client
+        mock_client = MagicMock()
+        mock_mistral_class.return_value = mock_client
 
-            schema = {"fields": [{"name": "total_revenue", "type": "currency"}]}
-            inputs = [{"page": 1, "text": "Total Revenue: $1,000,000"}]
+        # Setup mock response
+        mock_response = _chat_response(_SUMMARY_PAYLOAD)
 
-            result = await mistral_provider.extract_fields(schema, inputs)
+        mock_client.chat.complete_async = _async_return(mock_response)
 
-            assert len(result["fields"]) == 1
-            assert result["fields"][0]["name"] == "total_revenue"
-            assert result["fields"][0]["value"] == 1000000
-            assert result["fields"][0]["confidence"] == 0.98
+        await mistral_provider.initialize(mistral_config)
 
-    async def test_summarize_pages_success(self, mistral_provider, mistral_config):
-        """Test successful page summarization."""
-        with patch("docsray.providers.mistral.Mistral") as mock_mistral:
-            # Setup mock client
-            mock_client = MagicMock()
-            mock_mistral.return_value = mock_client
+        pages = [{"page": 1, "text": "Long document text here..."}]
 
-            # Setup mock response
-            mock_response = MagicMock()
-            mock_choice = MagicMock()
-            mock_message = MagicMock()
-            mock_message.content = "• Key finding 1\n• Key finding 2\n• Key finding 3"
-            mock_choice.message = mock_message
-            mock_response.choices = [mock_choice]
+        result = await mistral_provider.summarize_pages(pages, style="bullet")
 
-            mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        assert len(result) == 1
+        assert result[0]["page"] == 1
+        assert "Key finding" in result[0]["summary"]
 
-            await mistral_provider.initialize(mistral_config)
+    async def test_classify_pages_deduplicates_identical_samples(
+        self, mistral_provider
+    ):
+        """Test pages with identical samples are sent once and share a label."""
+        mock_response = _chat_response(
+            json.dumps(
+                {
+                    "labels": [
+                        {"page": 1, "label": "other", "confidence": 0.9},
+                        {"page": 2, "label": "notes", "confidence": 0.8},
+                    ]
+                }
+            )
+        )
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
 
-            pages = [{"page": 1, "text": "Long document text here..."}]
+        pages = [
+            {"page": 1, "textSample": "Annual Report 2024"},
+            {"page": 2, "textSample": "Notes to the accounts"},
+            {"page": 3, "textSample": "Annual Report 2024"},
+        ]
+        result = await mistral_provider.classify_pages(pages, ["notes"])
+
+        sent = mock_client.chat.complete_async.call_args.kwargs["messages"][1]
+        assert [row[0] for row in json.loads(sent.content)] == [1, 2]
+        assert {r["page"]: r["label"] for r in result} == {
+            1: "other",
+            2: "notes",
+            3: "other",
+        }
 
-            result = await mistral_provider.summarize_pages(pages, style="bullet")
+    async def test_classify_pages_keeps_distinct_full_text_pages(
+        self, mistral_provider
+    ):
+        """Test pages keyed by 'text', or with no text, are not merged."""
+        mock_response = _chat_response(
+            json.dumps(
+                {
+                    "labels": [
+                        {"page": 1, "label": "notes", "confidence": 0.9},
+                        {"page": 2, "label": "other", "confidence": 0.8},
+                        {"page": 3, "label": "other", "confidence": 0.5},
+                        {"page": 4, "label": "other", "confidence": 0.5},
+                    ]
+                }
+            )
+        )
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+
+        pages = [
+            {"page": 1, "text": "Notes to the accounts"},
+            {"page": 2, "text": "Annual Report 2024"},
+            {"page": 3, "text": ""},
+            {"page": 4, "textSample": ""},
+        ]
+        result = await mistral_provider.classify_pages(pages, ["notes"])
+
+        sent = mock_client.chat.complete_async.call_args.kwargs["messages"][1]
+        assert [row[0] for row in json.loads(sent.content)] == [1, 2, 3, 4]
+        assert [(r["page"], r["label"]) for r in result] == [
+            (1, "notes"),
+            (2, "other"),
+            (3, "other"),
+            (4, "other"),
+        ]
+
+    async def test_summarize_pages_deduplicates_identical_pages(
+        self, mistral_provider
+    ):
+        """Test pages with identical text are summarized once."""
+        mock_response = _chat_response("- Boilerplate")
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+
+        pages = [
+            {"page": 1, "text": "This page intentionally left blank"},
+            {"page": 2, "text": "This page intentionally left blank"},
+        ]
+        result = await mistral_provider.summarize_pages(pages)
 
-            assert len(result) == 1
-            assert result[0]["page"] == 1
-            assert "Key finding" in result[0]["summary"]
+        assert mock_client.chat.complete_async.await_count == 1
+        assert [r["page"] for r in result] == [1, 2]
+        assert result[1]["summary"] == "- Boilerplate"
+
+    async def test_summarize_pages_batches_requests(self, mistral_provider):
+        """Test several pages are summarized in one JSON-mode request."""
+        mock_response = _chat_response(
+            json.dumps(
+                {"summaries": [{"page": 1, "summary": "- Revenue grew"}]}
+            )
+        )
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+
+        pages = [
+            {"page": 1, "text": "Revenue grew by ten percent"},
+            {"page": 2, "text": "Costs were flat"},
+        ]
+        result = await mistral_provider.summarize_pages(pages, batch_size=8)
+
+        assert mock_client.chat.complete_async.await_count == 1
+        assert result[0] == {"page": 1, "summary": "- Revenue grew"}
+        assert result[1]["summary"].startswith("Error:")
+
+    async def test_summarize_pages_coalesces_concurrent_calls(
+        self, mistral_provider
+    ):
+        """Test small concurrent summaries of different docs share one request."""
+        mock_response = _chat_response(
+            json.dumps(
+                {
+                    "summaries": [
+                        {"page": 0, "summary": "- Doc A"},
+                        {"page": 1, "summary": "- Doc B"},
+                    ]
+                }
+            )
+        )
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+        mistral_provider._summary_coalescer = RequestCoalescer(
+            mistral_provider._summarize_coalesced, window=0.01
+        )
+
+        first, second = await asyncio.gather(
+            mistral_provider.summarize_pages([{"page": 1, "text": "Alpha"}]),
+            mistral_provider.summarize_pages([{"page": 1, "text": "Beta"}]),
+        )
+
+        assert mock_client.chat.complete_async.await_count == 1
+        assert first == [{"page": 1, "summary": "- Doc A"}]
+        assert second == [{"page": 1, "summary": "- Doc B"}]
+
+    async def test_coalesced_summaries_respect_input_token_budget(
+        self, mistral_provider
+    ):
+        """Test coalesced text-heavy pages are regrouped by token budget."""
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(
+            return_value=_chat_response("- Summary")
+        )
+        mistral_provider._client = mock_client
+        mistral_provider._summary_coalescer = RequestCoalescer(
+            mistral_provider._summarize_coalesced, window=0.01
+        )
+
+        results = await asyncio.gather(
+            *(
+                mistral_provider.summarize_pages(
+                    [{"page": 1, "text": f"{i} " + "word " * 400}],
+                    max_input_tokens=600,
+                )
+                for i in range(3)
+            )
+        )
+
+        # Each page fills most of the budget, so none can share a request
+        assert mock_client.chat.complete_async.await_count == 3
+        assert results == [[{"page": 1, "summary": "- Summary"}]] * 3
+
+    async def test_summarize_pages_respects_input_token_budget(
+        self, mistral_provider
+    ):
+        """Test text-heavy pages are split across requests by token budget."""
+        mock_response = _chat_response("- Summary")
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+
+        pages = [{"page": i, "text": f"{i} " + "word " * 400} for i in (1, 2)]
+        result = await mistral_provider.summarize_pages(
+            pages, batch_size=8, max_input_tokens=600
+        )
+
+        assert mock_client.chat.complete_async.await_count == 2
+        assert [r["summary"] for r in result] == ["- Summary", "- Summary"]
+
+    async def test_merge_summaries_is_hierarchical(self, mistral_provider):
+        """Test summaries are merged in chunks, then merged again."""
+        mock_response = _chat_response("- Merged")
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+
+        summaries = [
+            {"page": i, "summary": f"- Point {i} " + "detail " * 100}
+            for i in range(1, 5)
+        ]
+        merged = await mistral_provider.merge_summaries(
+            summaries + [{"page": 5, "summary": "Error: timeout"}],
+            max_input_tokens=300,
+        )
+
+        # Two chunks of two summaries, then one merge of the chunk results
+        assert merged == "- Merged"
+        assert mock_client.chat.complete_async.await_count == 3
+        assert await mistral_provider.merge_summaries(summaries[:1]) == (
+            summaries[0]["summary"]
+        )
+
+    async def test_summarize_pages_propagates_cancellation(self, mistral_provider):
+        """Test a cancelled group request cancels the call instead of failing it."""
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(
+            side_effect=asyncio.CancelledError()
+        )
+        mistral_provider._client = mock_client
+
+        with pytest.raises(asyncio.CancelledError):
+            await mistral_provider.summarize_pages([{"page": 1, "text": "Alpha"}])
+
+    async def test_summarize_pages_isolates_failures(self, mistral_provider):
+        """Test one failing page does not fail the other pages."""
+        mock_response = _chat_response("- Summary")
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(
+            side_effect=[mock_response, ValueError("bad request")]
+        )
+        mistral_provider._client = mock_client
+
+        pages = [{"page": 1, "text": "First page"}, {"page": 2, "text": "Second"}]
+        result = await mistral_provider.summarize_pages(
+            pages, batch_size=1, max_concurrency=1
+        )
+
+        assert [r["page"] for r in result] == [1, 2]
+        assert result[0]["summary"] == "- Summary"
+        assert result[1]["summary"].startswith("Error:")
+
+    async def test_extract_fields_uses_response_cache(self, mistral_provider):
+        """Test identical extraction/classification requests hit the cache."""
+        mock_client = MagicMock()
+        mock_response = _chat_response(json.dumps({"fields": [], "errors": []}))
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+
+        mistral_provider._initialized = True
+        mistral_provider._client = mock_client
+        mistral_provider._response_cache = SemanticCache()
+
+        schema = {"fields": [{"name": "total_revenue", "type": "currency"}]}
+        inputs = [{"page": 1, "text": "Total Revenue: $1,000,000"}]
+
+        await mistral_provider.extract_fields(schema, inputs)
+        await mistral_provider.extract_fields(schema, inputs)
+
+        assert mock_client.chat.complete_async.await_count == 1
+
+        pages = [{"page": 1, "textSample": "Total Revenue"}]
+        await mistral_provider.classify_pages(pages, ["income_statement"])
+        await mistral_provider.classify_pages(pages, ["income_statement"])
+
+        assert mock_client.chat.complete_async.await_count == 2
+
+    async def test_embed_goes_through_rate_limiter_and_slots(
+        self, mistral_provider, mistral_config
+    ):
+        """Test embedding calls share the chat rate limiter and request slots."""
+        mistral_provider.config = mistral_config
+        in_flight = []
+
+        async def create(**_kwargs):
+            in_flight.append(mistral_provider.request_stats["in_flight"])
+            response = MagicMock()
+            response.data = [MagicMock(embedding=[0.1, 0.2])]
+            return response
+
+        mock_client = MagicMock()
+        mock_client.embeddings.create_async = AsyncMock(side_effect=create)
+        mistral_provider._client = mock_client
+        limiter = MagicMock()
+        limiter.acquire = AsyncMock()
+        mistral_provider._rate_limiter = limiter
+
+        assert await mistral_provider._embed("Total Revenue") == [0.1, 0.2]
+
+        limiter.acquire.assert_awaited_once()
+        limiter.on_success.assert_called_once()
+        assert in_flight == [1]
+        assert mistral_provider.request_stats["in_flight"] == 0
+
+    async def test_extract_fields_splits_long_input(self, mistral_provider):
+        """Test inputs over the token budget are sent as several requests."""
+
+        def make_response(fields):
+            return _chat_response(json.dumps({"fields": fields, "errors": []}))
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(
+            side_effect=[
+                make_response(
+                    [{"name": "total_revenue", "value": None, "confidence": 0.0}]
+                ),
+                make_response(
+                    [{"name": "total_revenue", "value": "$1M", "confidence": 0.9}]
+                ),
+            ]
+        )
+        mistral_provider._client = mock_client
+
+        schema = {"fields": [{"name": "total_revenue", "type": "currency"}]}
+        inputs = [
+            {"page": 1, "text": "Overview " * 100},
+            {"page": 2, "text": "Total Revenue: $1M " * 100},
+        ]
+
+        result = await mistral_provider.extract_fields(
+            schema, inputs, max_input_tokens=300
+        )
+
+        assert mock_client.chat.complete_async.await_count == 2
+        assert result["fields"] == [
+            {"name": "total_revenue", "value": "$1M", "confidence": 0.9}
+        ]
+
+    async def test_extract_fields_with_tool_calling(self, mistral_provider):
+        """Test fields are read from the forced function call when enabled."""
+        mock_call = MagicMock()
+        mock_call.function.name = "emit_fields"
+        mock_call.function.arguments = json.dumps(
+            {"fields": [{"name": "total_revenue", "value": 1000, "confidence": 0.9}]}
+        )
+        mock_response = _chat_response(None)
+        mock_response.choices[0].message.tool_calls = [mock_call]
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+        mistral_provider.config = MistralOCRConfig(tool_calling=True)
+
+        schema = {"fields": [{"name": "total_revenue", "type": "currency"}]}
+        inputs = [{"page": 1, "text": "Total Revenue: $1,000"}]
+
+        result = await mistral_provider.extract_fields(schema, inputs)
+
+        call_kwargs = mock_client.chat.complete_async.call_args.kwargs
+        assert "response_format" not in call_kwargs
+        assert call_kwargs["tool_choice"]["function"]["name"] == "emit_fields"
+        assert result["fields"][0]["value"] == 1000
+
+    async def test_classify_pages_batch(self, mistral_provider):
+        """Test classification through the Batch API round-trip."""
+        output_line = _batch_output_line(
+            "0",
+            {"labels": [{"page": 1, "label": "notes", "confidence": 0.8}]},
+        )
+
+        mock_client = MagicMock()
+        mock_client.files.upload_async = AsyncMock(return_value=MagicMock(id="file-1"))
+        mock_client.batch.jobs.create_async = AsyncMock(
+            return_value=MagicMock(id="job-1", status="QUEUED")
+        )
+        mock_client.batch.jobs.get_async = AsyncMock(
+            side_effect=[
+                MagicMock(status="RUNNING"),
+                MagicMock(status="SUCCESS", output_file="file-2"),
+            ]
+        )
+        mock_client.files.download_async = AsyncMock(
+            return_value=httpx.Response(200, content=output_line.encode())
+        )
+        mistral_provider._client = mock_client
+
+        with patch("docsray.providers.mistral.asyncio.sleep", new=AsyncMock()):
+            result = await mistral_provider.classify_pages_batch(
+                [{"page": 1, "textSample": "Notes to the accounts"}], ["notes"]
+            )
+
+        assert result == [{"page": 1, "label": "notes", "confidence": 0.8}]
+        upload = mock_client.files.upload_async.call_args.kwargs
+        assert upload["purpose"] == "batch"
+        assert json.loads(upload["file"]["content"])["custom_id"] == "0"
+
+    async def test_extract_fields_batch_collected_later(self, mistral_provider):
+        """Test a batch extraction can be submitted and collected separately."""
+        schema = {"fields": [{"name": "total", "type": "currency"}]}
+        field = {"name": "total", "value": 10, "confidence": 0.9, "source": {}}
+        output = "\n".join(
+            [
+                _batch_output_line("1", {"fields": [], "errors": ["missing"]}),
+                _batch_output_line("0", {"fields": [field], "errors": []}),
+            ]
+        )
+
+        mock_client = MagicMock()
+        mock_client.files.upload_async = AsyncMock(return_value=MagicMock(id="file-1"))
+        mock_client.batch.jobs.create_async = AsyncMock(
+            return_value=MagicMock(id="job-1", status="QUEUED")
+        )
+        mock_client.batch.jobs.get_async = AsyncMock(
+            return_value=MagicMock(status="SUCCESS", output_file="file-2")
+        )
+        mock_client.files.download_async = AsyncMock(
+            return_value=httpx.Response(200, content=output.encode())
+        )
+        mistral_provider._client = mock_client
+
+        job = await mistral_provider.extract_fields_batch(
+            schema, [{"page": 1, "text": "Total: 10"}], wait=False
+        )
+        assert job == {"job_id": "job-1", "status": "QUEUED"}
+
+        result = await mistral_provider.collect_extraction_batch("job-1", schema)
+        assert result == {"fields": [field], "errors": ["missing"]}
+
+    async def test_complete_without_mistralai_raises(self, mistral_provider):
+        """Test a clear error is raised when the SDK message types are missing."""
+        mistral_provider._client = MagicMock()
+
+        with patch("docsray.providers.mistral.SystemMessage", None), pytest.raises(
+            RuntimeError, match="mistralai package not installed"
+        ):
+            await mistral_provider._complete("system", "content", model="m")
+
+    async def test_rate_limited_request_is_retried(self, mistral_provider):
+        """Test 429 responses are retried, honoring Retry-After."""
+        rate_limited = Exception("rate limited")
+        rate_limited.status_code = 429
+        rate_limited.raw_response = httpx.Response(429, headers={"retry-after": "3"})
+
+        mock_response = _chat_response("Analysis")
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(
+            side_effect=[rate_limited, mock_response]
+        )
+        mistral_provider._client = mock_client
+
+        with patch(
+            "docsray.providers.mistral.asyncio.sleep", new=AsyncMock()
+        ) as mock_sleep:
+            result = await mistral_provider._analyze_content(
+                "Document text long enough to be worth analyzing", {}
+            )
+
+        assert result["analysis"] == "Analysis"
+        assert mock_client.chat.complete_async.await_count == 2
+        mock_sleep.assert_awaited_once_with(3.0)
+
+    async def test_request_slots_bound_and_record_concurrency(
+        self, mistral_provider
+    ):
+        """Test requests beyond max_concurrency wait and are counted."""
+
+        async def slow_completion(**_request):
+            await asyncio.sleep(0.01)
+            return MagicMock()
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(side_effect=slow_completion)
+        mistral_provider._client = mock_client
+        mistral_provider._request_semaphore = asyncio.Semaphore(2)
+
+        await asyncio.gather(
+            *(mistral_provider._call_with_retry(model="m") for _ in range(5))
+        )
+
+        stats = mistral_provider.request_stats
+        assert stats["peak_in_flight"] == 2
+        assert stats["saturated"] == 3
+        assert stats["in_flight"] == stats["waiting"] == 0
+
+    async def test_client_error_is_not_retried(self, mistral_provider):
+        """Test non-retryable errors fail without retrying."""
+        bad_request = Exception("bad request")
+        bad_request.status_code = 400
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(side_effect=bad_request)
+        mistral_provider._client = mock_client
+
+        result = await mistral_provider._analyze_content(
+            "Document text long enough to be worth analyzing", {}
+        )
+
+        assert result["confidence"] == 0.0
+        assert mock_client.chat.complete_async.await_count == 1
+
+    async def test_empty_content_skips_api_call(self, mistral_provider):
+        """Test empty text is not sent to Mistral."""
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock()
+        mistral_provider._client = mock_client
+
+        analysis = await mistral_provider._analyze_content("  ", {})
+        summaries = await mistral_provider.summarize_pages([{"page": 1, "text": ""}])
+
+        assert analysis["reason"] == "insufficient_content"
+        assert summaries == [{"page": 1, "summary": ""}]
+        mock_client.chat.complete_async.assert_not_awaited()
+
+    async def test_structured_extract_truncates_by_tokens(self, mistral_provider):
+        """Test structured extraction input is capped to the token budget."""
+        mock_response = _chat_response('{"total": 1}')
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock(return_value=mock_response)
+        mistral_provider._client = mock_client
+
+        with patch("docsray.providers.mistral._tokenizer", return_value=None):
+            result = await mistral_provider._structured_extract(
+                "word " * 10000, {"schema": {"total": "number"}, "max_input_tokens": 50}
+            )
+
+        assert result == {"total": 1}
+        messages = mock_client.chat.complete_async.call_args.kwargs["messages"]
+        assert len(messages[1].content) < 50 * 4 + 100
+
+    async def test_extract_simple_mode_skips_api_call(
+        self, mistral_provider, tmp_path
+    ):
+        """Test simple mode returns local text without calling Mistral."""
+        doc_path = tmp_path / "notes.md"
+        doc_path.write_text("# Notes\n\nQuarterly revenue grew by ten percent.")
+
+        mock_client = MagicMock()
+        mock_client.chat.complete_async = AsyncMock()
+        mistral_provider._initialized = True
+        mistral_provider._client = mock_client
+
+        doc = Document(url=str(doc_path), path=doc_path, format="md")
+        result = await mistral_provider.extract(
+            doc, {"format": "structured", "mode": "simple"}
+        )
+
+        assert result.format == "text"
+        assert "Quarterly revenue" in result.content
+        mock_client.chat.complete_async.assert_not_awaited()
+
+    def test_http_limits_follow_concurrency(self):
+        """Test the keep-alive pool covers every concurrent request slot."""
+        assert _http_limits(8).max_keepalive_connections == 32
+        limits = _http_limits(100)
+        assert limits.max_keepalive_connections == 100
+        assert limits.max_connections == 200
+
+    def test_truncate_to_tokens(self):
+        """Test content is cut by token count, with a character fallback."""
+        tokenizer = MagicMock()
+        tokenizer.encode.side_effect = lambda text, **_: text.split()
+        tokenizer.decode.side_effect = " ".join
+
+        text = "one two three four five"
+        with patch("docsray.providers.mistral._tokenizer", return_value=tokenizer):
+            assert _truncate_to_tokens(text, 5) == text
+            assert _truncate_to_tokens(text, 2).startswith("one two\n\n[Content")
+
+        with patch("docsray.providers.mistral._tokenizer", return_value=None):
+            assert _truncate_to_tokens("x" * 10, 2).startswith("x" * 8 + "\n\n")
+
+    def test_extract_pdf_text_markdown(self, tmp_path):
+        """Test Markdown extraction goes through pymupdf4llm when requested."""
+        doc_path = tmp_path / "doc.pdf"
+        markdown = MagicMock()
+        markdown.to_markdown.return_value = "# Title"
+
+        with patch("docsray.providers.mistral.pymupdf4llm", markdown):
+            assert _extract_pdf_text(doc_path, markdown=True) == "# Title"
+
+        markdown.to_markdown.assert_called_once_with(str(doc_path))
 
     def test_build_classification_prompt(self, mistral_provider):
         """Test classification prompt building."""
@@ -245,35 +991,116 @@ class TestMistralProvider:
         assert "fiscal_year_end" in prompt
         assert "date" in prompt
 
-    def test_build_summary_prompt(self, mistral_provider):
+    @pytest.mark.parametrize(
+        "style,expected",
+        [
+            ("bullet", "bullet-point"),
+            ("paragraph", "paragraph"),
+            ("executive", "executive"),
+        ],
+    )
+    def test_build_summary_prompt(self, mistral_provider, style, expected):
         """Test summary prompt building."""
-        prompt_bullet = mistral_provider._build_summary_prompt("bullet")
-        assert "bullet-point" in prompt_bullet
+        assert expected in mistral_provider._build_summary_prompt(style)
+
+    @pytest.mark.parametrize(
+        "item,valid",
+        [
+            ({"page": 1, "label": "income_statement", "confidence": 0.95}, True),
+            ({"page": 2, "label": "notes", "confidence": 0}, True),
+            ({"page": 3, "label": "invalid_label", "confidence": 0.5}, False),
+            ({"page": 4, "label": "notes", "confidence": 1.5}, False),
+            ({"page": 5, "label": "notes"}, False),
+        ],
+    )
+    def test_validate_classification_result(self, mistral_provider, item, valid):
+        """Test classification result validation."""
+        pages = [{"page": item["page"]}]
+        labels = ["income_statement", "balance_sheet", "notes"]
 
-        prompt_para = mistral_provider._build_summary_prompt("paragraph")
-        assert "paragraph" in prompt_para
+        validated = mistral_provider._validate_classification_result(
+            [item], pages, labels
+        )
 
-        prompt_exec = mistral_provider._build_summary_prompt("executive")
-        assert "executive" in prompt_exec
+        assert validated == ([item] if valid else [])
 
-    def test_validate_classification_result(self, mistral_provider):
-        """Test classification result validation."""
-        result = [
-            {"page": 1, "label": "income_statement", "confidence": 0.95},
-            {"page": 2, "label": "balance_sheet", "confidence": 0.92},
-            {"page": 3, "label": "invalid_label", "confidence": 0.5},  # Invalid label
-            {"page": 4, "label": "notes", "confidence": 1.5},  # Invalid confidence
+    @pytest.mark.parametrize("malformed", [{"labels": None}, {"labels": "other"}, {}])
+    def test_validate_classification_result_malformed(
+        self, mistral_provider, malformed
+    ):
+        """Test classification payloads without a label list validate to nothing."""
+        assert (
+            mistral_provider._validate_classification_result(
+                malformed, [{"page": 1}], ["notes"]
+            )
+            == []
+        )
+
+    def test_fast_classification_decodes_strict_payload(self):
+        """Test the msgspec path filters labels and rejects malformed payloads."""
+        pytest.importorskip("msgspec")
+
+        label_set = frozenset({"notes", "other"})
+        valid = json.dumps(
+            {
+                "labels": [
+                    {"page": 1, "label": "notes", "confidence": 0.9},
+                    {"page": 2, "label": "bogus", "confidence": 0.9},
+                ]
+            }
+        )
+        assert _fast_classification(_chat_response(valid), label_set) == [
+            {"page": 1, "label": "notes", "confidence": 0.9}
         ]
-        pages = [{"page": i} for i in range(1, 5)]
-        labels = ["income_statement", "balance_sheet", "notes"]
 
-        validated = mistral_provider._validate_classification_result(
-            result, pages, labels
+        out_of_range = '{"labels": [{"page": 1, "label": "notes", "confidence": 2}]}'
+        assert _fast_classification(_chat_response(out_of_range), label_set) is None
+
+        call = MagicMock()
+        call.function.name = "label_pages"
+        call.function.arguments = valid
+        tool_response = _chat_response(None)
+        tool_response.choices[0].message.tool_calls = [call]
+        assert _fast_classification(tool_response, label_set, "label_pages") == [
+            {"page": 1, "label": "notes", "confidence": 0.9}
+        ]
+
+    def test_fast_extraction_decodes_strict_payload(self):
+        """Test the msgspec extraction path keeps fields and rejects bad ones."""
+        pytest.importorskip("msgspec")
+
+        response = _chat_response(
+            json.dumps(
+                {
+                    "fields": [
+                        {"name": "revenue", "value": 100, "confidence": 1},
+                        {
+                            "name": "date",
+                            "value": "2024-12-31",
+                            "confidence": 0.8,
+                            "source": {"page": 2},
+                        },
+                    ]
+                }
+            )
         )
+        assert _fast_extraction(response) == {
+            "fields": [
+                {"name": "revenue", "value": 100, "confidence": 1.0},
+                {
+                    "name": "date",
+                    "value": "2024-12-31",
+                    "confidence": 0.8,
+                    "source": {"page": 2},
+                },
+            ],
+            "errors": [],
+        }
 
-        assert len(validated) == 2  # Only first 2 are valid
-        assert validated[0]["label"] == "income_statement"
-        assert validated[1]["label"] == "balance_sheet"
+        response = _chat_response(
+            json.dumps({"fields": [{"name": "revenue", "value": 100}]})
+        )
+        assert _fast_extraction(response) is None
 
     def test_validate_extraction_result(self, mistral_provider):
         """Test extraction result validation."""
@@ -291,24 +1118,107 @@ class TestMistralProvider:
         assert len(validated["fields"]) == 1  # Only first field is valid
         assert validated["fields"][0]["name"] == "total_revenue"
 
+    async def test_ensure_local_document_resolves_url_once(
+        self, mistral_provider, tmp_path
+    ):
+        """Test repeated operations on a URL download and hash it once."""
+        doc_path = tmp_path / "doc.pdf"
+        doc_path.write_bytes(b"%PDF-1.4 test")
+        url = "https://example.com/doc.pdf"
+
+        with patch(
+            "docsray.providers.mistral.download_document",
+            AsyncMock(return_value=doc_path),
+        ) as mock_download, patch(
+            "docsray.providers.mistral.calculate_file_hash", return_value="abc"
+        ) as mock_hash:
+            for _ in range(3):
+                document = Document(url=url)
+                assert await mistral_provider._ensure_local_document(document) == (
+                    doc_path
+                )
+                assert document.hash == "abc"
+
+        mock_download.assert_awaited_once_with(url)
+        mock_hash.assert_called_once_with(doc_path)
+
+    async def test_local_document_tracking_is_bounded(
+        self, mistral_provider, tmp_path
+    ):
+        """Test finished downloads are forgotten and tracked paths are capped."""
+        paths = {}
+        for name in ("a", "b", "c"):
+            paths[name] = tmp_path / f"{name}.pdf"
+            paths[name].write_bytes(name.encode())
+
+        async def download(url):
+            await asyncio.sleep(0)
+            return paths[url.rsplit("/", 1)[1]]
+
+        with patch(
+            "docsray.providers.mistral.download_document",
+            AsyncMock(side_effect=download),
+        ) as mock_download, patch(
+            "docsray.providers.mistral._MAX_TRACKED_DOCUMENTS", 2
+        ):
+            for name in paths:
+                url = f"https://example.com/{name}"
+                resolved = await asyncio.gather(
+                    *(mistral_provider._resolve_local_path(url) for _ in range(2))
+                )
+                assert resolved == [paths[name]] * 2
+                await asyncio.to_thread(mistral_provider._file_hash, paths[name])
+
+        assert mock_download.await_count == 3
+        assert not mistral_provider._local_path_downloads
+        assert list(mistral_provider._local_paths) == [
+            "https://example.com/b",
+            "https://example.com/c",
+        ]
+        assert list(mistral_provider._file_hashes) == [paths["b"], paths["c"]]
+
+    @pytest.mark.usefixtures("mock_mistral_class")
     async def test_dispose(self, mistral_provider, mistral_config):
         """Test provider disposal."""
-        with patch("docsray.providers.mistral.Mistral"):
-            await mistral_provider.initialize(mistral_config)
-            assert mistral_provider._initialized is True
+        await mistral_provider.initialize(mistral_config)
+        assert mistral_provider._initialized is True
+
+        await mistral_provider.dispose()
+
+        assert mistral_provider._initialized is False
+        assert mistral_provider._client is None
+
+    async def test_dispose_closes_shared_pdf_handles(self, mistral_provider, tmp_path):
+        """Test disposal closes the PDF handles kept open between reads."""
+        pdf_path = tmp_path / "doc.pdf"
+        pdf_path.write_bytes(b"%PDF")
+        pdf = MagicMock()
+
+        with patch.object(pdf_pages, "fitz") as mock_fitz:
+            mock_fitz.open.return_value = pdf
+            assert pdf_pages.page_count(pdf_path) == len(pdf)
+        assert pdf_pages._handles
+
+        await mistral_provider.dispose()
+
+        assert not pdf_pages._handles
+        pdf.close.assert_called_once()
 
+    async def test_dispose_shuts_down_page_read_pools(self, mistral_provider):
+        """Test disposal stops the worker pools used for parallel page reads."""
+        pool = MagicMock()
+        with patch.dict(pdf_pages._pools, {2: pool}, clear=True):
             await mistral_provider.dispose()
 
-            assert mistral_provider._initialized is False
-            assert mistral_provider._client is None
+            assert not pdf_pages._pools
+        pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
 
 
 @pytest.mark.integration
-@pytest.mark.asyncio
+@pytest.mark.skip(reason="Requires valid Mistral API key")
 class TestMistralProviderIntegration:
     """Integration tests for Mistral provider (requires API key)."""
 
-    @pytest.mark.skip(reason="Requires valid Mistral API key")
     async def test_real_classification(self, mistral_provider):
         """Test real classification with Mistral API."""
         # This test requires MISTRAL_API_KEY environment variable
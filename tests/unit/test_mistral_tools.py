@@ -1,290 +1,181 @@
 """Unit tests for Mistral AI tools parameter handling."""
 
+import asyncio
 import json
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from docsray.tools import mistral_tools as _mt
 from docsray.tools.mistral_tools import (
+    _document_path,
+    _extract_page_samples,
+    _extract_page_text,
     coerce_parameter,
     handle_classify_pages,
     handle_extract_fields,
     handle_summarize,
 )
+from docsray.utils.cache import DocumentCache
 
 
 class TestParameterCoercion:
     """Test suite for parameter type coercion."""
 
-    def test_coerce_dict_from_string(self):
-        """Test coercing a stringified dict."""
-        input_str = '{"start": 1, "end": 5}'
-        result = coerce_parameter(input_str, dict)
-        assert isinstance(result, dict)
-        assert result == {"start": 1, "end": 5}
-
-    def test_coerce_list_from_string(self):
-        """Test coercing a stringified list."""
-        input_str = '["income_statement", "balance_sheet"]'
-        result = coerce_parameter(input_str, list)
-        assert isinstance(result, list)
-        assert result == ["income_statement", "balance_sheet"]
-
-    def test_coerce_already_dict(self):
-        """Test that already-dict parameters pass through unchanged."""
-        input_dict = {"start": 1, "end": 5}
-        result = coerce_parameter(input_dict, dict)
-        assert result is input_dict
-        assert result == {"start": 1, "end": 5}
-
-    def test_coerce_already_list(self):
-        """Test that already-list parameters pass through unchanged."""
-        input_list = ["income_statement", "balance_sheet"]
-        result = coerce_parameter(input_list, list)
-        assert result is input_list
-        assert result == ["income_statement", "balance_sheet"]
-
-    def test_coerce_invalid_json(self):
-        """Test handling of invalid JSON string."""
-        input_str = "{invalid json}"
-        result = coerce_parameter(input_str, dict)
-        # Should return the original string if parsing fails
-        assert result == input_str
-
-    def test_coerce_none(self):
-        """Test handling of None value."""
-        result = coerce_parameter(None, dict)
-        assert result is None
-
-    def test_coerce_empty_string(self):
-        """Test handling of empty string."""
-        result = coerce_parameter("", dict)
-        # Empty string should fail to parse and return as-is
-        assert result == ""
-
-    def test_coerce_complex_nested_dict(self):
-        """Test coercing complex nested structures."""
-        input_str = '{"fields": [{"name": "revenue", "type": "currency"}]}'
-        result = coerce_parameter(input_str, dict)
-        assert isinstance(result, dict)
-        assert "fields" in result
-        assert isinstance(result["fields"], list)
-        assert result["fields"][0]["name"] == "revenue"
-
-    def test_coerce_list_of_numbers(self):
-        """Test coercing a list of numbers."""
-        input_str = "[1, 30, 31, 32]"
-        result = coerce_parameter(input_str, list)
-        assert isinstance(result, list)
-        assert result == [1, 30, 31, 32]
+    @pytest.mark.parametrize(
+        "value,target,expected",
+        [
+            ('{"start": 1, "end": 5}', dict, {"start": 1, "end": 5}),
+            (
+                '["income_statement", "balance_sheet"]',
+                list,
+                ["income_statement", "balance_sheet"],
+            ),
+            (
+                '{"fields": [{"name": "revenue", "type": "currency"}]}',
+                dict,
+                {"fields": [{"name": "revenue", "type": "currency"}]},
+            ),
+            ("[1, 30, 31, 32]", list, [1, 30, 31, 32]),
+            # Unparseable strings and None are returned as-is
+            ("{invalid json}", dict, "{invalid json}"),
+            ("", dict, ""),
+            ("42", list, "42"),
+            ("[unclosed list", list, "[unclosed list"),
+            ("[1, 2]", dict, "[1, 2]"),
+            ('  {"start": 1}\n', dict, {"start": 1}),
+            (None, dict, None),
+        ],
+    )
+    def test_coerce_parameter(self, value, target, expected):
+        """Test coercing stringified and unparseable parameters."""
+        assert coerce_parameter(value, target) == expected
+
+    @pytest.mark.parametrize(
+        "value,target",
+        [({"start": 1, "end": 5}, dict), (["income_statement"], list)],
+    )
+    def test_coerce_passes_through_target_type(self, value, target):
+        """Test that parameters already of the target type are returned unchanged."""
+        assert coerce_parameter(value, target) is value
 
 
-@pytest.mark.asyncio
 class TestClassifyPagesParameterHandling:
     """Test parameter handling in handle_classify_pages."""
 
-    async def test_classify_pages_with_string_labels(self):
+    async def test_classify_pages_with_string_labels(self, mock_registry, mock_pdf):
         """Test that stringified labels are properly coerced."""
-        with patch("docsray.tools.mistral_tools.download_document") as mock_download:
-            with patch("docsray.tools.mistral_tools.get_local_document"):
-                with patch("docsray.tools.mistral_tools.fitz") as mock_fitz:
-                    # Mock registry and provider
-                    mock_provider = MagicMock()
-                    mock_provider._initialized = True
-                    mock_provider.config.model = "pixtral-12b-2409"
-                    mock_provider.classify_pages = AsyncMock(
-                        return_value=[
-                            {"page": 1, "label": "income_statement", "confidence": 0.95}
-                        ]
-                    )
-
-                    mock_registry = MagicMock()
-                    mock_registry.get_provider.return_value = mock_provider
-
-                    # Mock PDF
-                    mock_pdf = MagicMock()
-                    mock_page = MagicMock()
-                    mock_page.get_text.return_value = "Sample income statement text"
-                    mock_pdf.__getitem__.return_value = mock_page
-                    mock_pdf.__len__.return_value = 1
-                    mock_fitz.open.return_value = mock_pdf
-
-                    # Call with stringified labels
-                    result = await handle_classify_pages(
-                        document_url="test.pdf",
-                        labels='["income_statement", "balance_sheet"]',  # Stringified JSON to test parameter coercion
-                        registry=mock_registry,
-                    )
-
-                    # Should succeed and coerce the labels
-                    assert "labels" in result
-                    assert result["labels"][0]["label"] == "income_statement"
-
-    async def test_classify_pages_with_string_page_range(self):
+        registry, provider = mock_registry
+        provider.classify_pages.return_value = [
+            {"page": 1, "label": "income_statement", "confidence": 0.95}
+        ]
+        mock_pdf.__len__.return_value = 1
+
+        result = await handle_classify_pages(
+            document_url="test.pdf",
+            labels='["income_statement", "balance_sheet"]',
+            registry=registry,
+        )
+
+        assert result["labels"][0]["label"] == "income_statement"
+        assert provider.classify_pages.await_args.kwargs["labels"] == [
+            "income_statement",
+            "balance_sheet",
+        ]
+
+    @pytest.mark.usefixtures("mock_pdf")
+    async def test_classify_pages_with_string_page_range(self, mock_registry):
         """Test that stringified page_range is properly coerced."""
-        with patch("docsray.tools.mistral_tools.download_document"):
-            with patch("docsray.tools.mistral_tools.get_local_document"):
-                with patch("docsray.tools.mistral_tools.fitz") as mock_fitz:
-                    # Mock registry and provider
-                    mock_provider = MagicMock()
-                    mock_provider._initialized = True
-                    mock_provider.config.model = "pixtral-12b-2409"
-                    mock_provider.classify_pages = AsyncMock(
-                        return_value=[
-                            {"page": 1, "label": "income_statement", "confidence": 0.95}
-                        ]
-                    )
-
-                    mock_registry = MagicMock()
-                    mock_registry.get_provider.return_value = mock_provider
-
-                    # Mock PDF
-                    mock_pdf = MagicMock()
-                    mock_page = MagicMock()
-                    mock_page.get_text.return_value = "Sample text"
-                    mock_pdf.__getitem__.return_value = mock_page
-                    mock_pdf.__len__.return_value = 5
-                    mock_fitz.open.return_value = mock_pdf
-
-                    # Call with stringified page_range
-                    result = await handle_classify_pages(
-                        document_url="test.pdf",
-                        labels=["income_statement"],
-                        page_range='{"start": 1, "end": 5}',  # Stringified JSON to test parameter coercion
-                        registry=mock_registry,
-                    )
-
-                    # Should succeed and coerce the page_range
-                    assert "labels" in result
-
-
-@pytest.mark.asyncio
+        registry, provider = mock_registry
+        provider.classify_pages.return_value = []
+
+        result = await handle_classify_pages(
+            document_url="test.pdf",
+            labels=["income_statement"],
+            page_range='{"start": 1, "end": 5}',
+            registry=registry,
+        )
+
+        assert result["total_pages"] == 5
+
+
 class TestExtractFieldsParameterHandling:
     """Test parameter handling in handle_extract_fields."""
 
-    async def test_extract_fields_with_string_schema(self):
+    @pytest.mark.usefixtures("mock_pdf")
+    async def test_extract_fields_with_string_schema(self, mock_registry):
         """Test that stringified schema is properly coerced."""
-        with patch("docsray.tools.mistral_tools.download_document"):
-            with patch("docsray.tools.mistral_tools.get_local_document"):
-                with patch("docsray.tools.mistral_tools.fitz") as mock_fitz:
-                    # Mock registry and provider
-                    mock_provider = MagicMock()
-                    mock_provider._initialized = True
-                    mock_provider.config.model = "pixtral-12b-2409"
-                    mock_provider.extract_fields = AsyncMock(
-                        return_value={
-                            "fields": [
-                                {
-                                    "name": "revenue",
-                                    "value": 1000000,
-                                    "confidence": 0.98,
-                                }
-                            ],
-                            "errors": [],
-                        }
-                    )
-
-                    mock_registry = MagicMock()
-                    mock_registry.get_provider.return_value = mock_provider
-
-                    # Mock PDF
-                    mock_pdf = MagicMock()
-                    mock_page = MagicMock()
-                    mock_page.get_text.return_value = "Revenue: $1,000,000"
-                    mock_pdf.__getitem__.return_value = mock_page
-                    mock_pdf.__len__.return_value = 1
-                    mock_fitz.open.return_value = mock_pdf
-
-                    # Call with stringified schema
-                    schema_str = '{"fields": [{"name": "revenue", "type": "currency"}]}'
-                    result = await handle_extract_fields(
-                        document_url="test.pdf",
-                        schema=schema_str,  # Stringified JSON to test parameter coercion
-                        registry=mock_registry,
-                    )
-
-                    # Should succeed and coerce the schema
-                    assert "fields" in result
-                    assert len(result["fields"]) > 0
-
-    async def test_extract_fields_with_string_page_filter(self):
+        registry, provider = mock_registry
+        provider.extract_fields.return_value = {
+            "fields": [{"name": "revenue", "value": 1000000, "confidence": 0.98}],
+            "errors": [],
+        }
+
+        result = await handle_extract_fields(
+            document_url="test.pdf",
+            schema='{"fields": [{"name": "revenue", "type": "currency"}]}',
+            registry=registry,
+        )
+
+        assert result["fields"][0]["name"] == "revenue"
+        assert provider.extract_fields.await_args.kwargs["schema"] == {
+            "fields": [{"name": "revenue", "type": "currency"}]
+        }
+
+    @pytest.mark.usefixtures("mock_pdf")
+    async def test_extract_fields_with_string_page_filter(self, mock_registry):
         """Test that stringified page_filter is properly coerced."""
-        with patch("docsray.tools.mistral_tools.download_document"):
-            with patch("docsray.tools.mistral_tools.get_local_document"):
-                with patch("docsray.tools.mistral_tools.fitz") as mock_fitz:
-                    # Mock registry and provider
-                    mock_provider = MagicMock()
-                    mock_provider._initialized = True
-                    mock_provider.config.model = "pixtral-12b-2409"
-                    mock_provider.extract_fields = AsyncMock(
-                        return_value={"fields": [], "errors": []}
-                    )
-
-                    mock_registry = MagicMock()
-                    mock_registry.get_provider.return_value = mock_provider
-
-                    # Mock PDF
-                    mock_pdf = MagicMock()
-                    mock_page = MagicMock()
-                    mock_page.get_text.return_value = "Sample text"
-                    mock_pdf.__getitem__.return_value = mock_page
-                    mock_pdf.__len__.return_value = 10
-                    mock_fitz.open.return_value = mock_pdf
-
-                    # Call with stringified page_filter
-                    result = await handle_extract_fields(
-                        document_url="test.pdf",
-                        schema={"fields": [{"name": "test", "type": "text"}]},
-                        page_filter='{"pages": [1, 5, 10]}',  # Stringified JSON to test parameter coercion
-                        registry=mock_registry,
-                    )
-
-                    # Should succeed and coerce the page_filter
-                    assert "fields" in result
-
-
-@pytest.mark.asyncio
+        registry, provider = mock_registry
+        provider.extract_fields.return_value = {"fields": [], "errors": []}
+
+        result = await handle_extract_fields(
+            document_url="test.pdf",
+            schema={"fields": [{"name": "test", "type": "text"}]},
+            page_filter='{"pages": [1, 5, 10]}',
+            registry=registry,
+        )
+
+        assert result["total_pages_processed"] == 3
+        inputs = provider.extract_fields.await_args.kwargs["inputs"]
+        assert [page["page"] for page in inputs] == [1, 5, 10]
+
+
 class TestSummarizeParameterHandling:
     """Test parameter handling in handle_summarize."""
 
-    async def test_summarize_with_string_page_range(self):
+    @pytest.mark.usefixtures("mock_pdf")
+    async def test_summarize_with_string_page_range(self, mock_registry):
         """Test that stringified page_range is properly coerced."""
-        with patch("docsray.tools.mistral_tools.download_document"):
-            with patch("docsray.tools.mistral_tools.get_local_document"):
-                with patch("docsray.tools.mistral_tools.fitz") as mock_fitz:
-                    # Mock registry and provider
-                    mock_provider = MagicMock()
-                    mock_provider._initialized = True
-                    mock_provider.config.model = "pixtral-12b-2409"
-                    mock_provider.summarize_pages = AsyncMock(
-                        return_value=[
-                            {"page": 1, "summary": "This is a summary of page 1"}
-                        ]
-                    )
-
-                    mock_registry = MagicMock()
-                    mock_registry.get_provider.return_value = mock_provider
-
-                    # Mock PDF
-                    mock_pdf = MagicMock()
-                    mock_page = MagicMock()
-                    mock_page.get_text.return_value = "Sample page content"
-                    mock_pdf.__getitem__.return_value = mock_page
-                    mock_pdf.__len__.return_value = 10
-                    mock_fitz.open.return_value = mock_pdf
-
-                    # Call with stringified page_range
-                    result = await handle_summarize(
-                        document_url="test.pdf",
-                        page_range='{"start": 1, "end": 10}',  # Stringified JSON to test parameter coercion
-                        registry=mock_registry,
-                    )
-
-                    # Should succeed and coerce the page_range
-                    assert "summaries" in result
-
-
-@pytest.mark.asyncio
+        registry, provider = mock_registry
+        provider.summarize_pages.return_value = [
+            {"page": 1, "summary": "This is a summary of page 1"}
+        ]
+
+        result = await handle_summarize(
+            document_url="test.pdf",
+            page_range='{"start": 1, "end": 10}',
+            registry=registry,
+        )
+
+        assert "summaries" in result
+        assert result["total_pages"] == 10
+
+    @pytest.mark.usefixtures("mock_pdf")
+    async def test_summarize_keeps_page_summaries_when_merge_fails(self, mock_registry):
+        """Test a failed merge is reported without losing the page summaries."""
+        registry, provider = mock_registry
+        summaries = [{"page": 1, "summary": "- Revenue grew"}]
+        provider.summarize_pages.return_value = summaries
+        provider.merge_summaries.side_effect = RuntimeError("rate limited")
+
+        result = await handle_summarize(
+            document_url="test.pdf", merge=True, registry=registry
+        )
+
+        assert result["summaries"] == summaries
+        assert result["document_summary"] == "Error: rate limited"
+
 class TestErrorHandling:
     """Test error handling in tools."""
 
@@ -300,19 +191,176 @@ class TestErrorHandling:
         assert "error" in result
         assert "Mistral provider not available" in result["error"]
 
-    async def test_extract_fields_provider_not_initialized(self):
+    async def test_extract_fields_provider_not_initialized(self, mock_registry):
         """Test error when provider is not initialized."""
-        mock_provider = MagicMock()
-        mock_provider._initialized = False
-
-        mock_registry = MagicMock()
-        mock_registry.get_provider.return_value = mock_provider
+        registry, provider = mock_registry
+        provider._initialized = False
 
         result = await handle_extract_fields(
             document_url="test.pdf",
             schema={"fields": []},
-            registry=mock_registry,
+            registry=registry,
         )
 
         assert "error" in result
         assert "failed to initialize" in result["error"]
+
+
+class TestEmptySelection:
+    """Test handlers skip all work for empty page selections."""
+
+    async def test_empty_selections_short_circuit(self, mock_download, mock_registry):
+        """Test empty ranges/filters return without downloads or API calls."""
+        mock_registry, mock_provider = mock_registry
+
+        classified = await handle_classify_pages(
+            document_url="https://example.com/doc.pdf",
+            labels=["notes"],
+            page_range={"start": 9, "end": 3},
+            registry=mock_registry,
+        )
+        extracted = await handle_extract_fields(
+            document_url="https://example.com/doc.pdf",
+            schema={"fields": []},
+            page_filter='{"pages": []}',
+            registry=mock_registry,
+        )
+        summarized = await handle_summarize(
+            document_url="https://example.com/doc.pdf",
+            page_range={"start": 2, "end": 1},
+            merge=True,
+            registry=mock_registry,
+        )
+
+        assert classified["labels"] == [] and classified["total_pages"] == 0
+        assert extracted["fields"] == [] and extracted["total_pages_processed"] == 0
+        assert summarized["summaries"] == [] and summarized["document_summary"] == ""
+        mock_download.assert_not_called()
+        mock_provider.classify_pages.assert_not_called()
+        mock_provider.extract_fields.assert_not_called()
+
+
+class TestPageCache:
+    """Test suite for the shared per-document page cache."""
+
+    async def test_pages_read_once_per_document_content(self, tmp_path):
+        """Test samples, text and prefixes share reads of each page."""
+        first = tmp_path / "a.pdf"
+        second = tmp_path / "b.pdf"
+        first.write_bytes(b"%PDF same bytes")
+        second.write_bytes(b"%PDF same bytes")
+        cache = DocumentCache()
+
+        async def read(_doc_path, page_nums, _workers=1, max_chars=None):
+            return [(f"Page {n} " + "text " * 20)[:max_chars] for n in page_nums]
+
+        with patch.object(_mt, "pdf_page_count", return_value=3), patch.object(
+            _mt, "read_pages", AsyncMock(side_effect=read)
+        ) as mock_read:
+            samples = await _extract_page_samples(first, {"end": 2}, cache=cache)
+            again = await _extract_page_samples(second, {"end": 2}, cache=cache)
+            text = await _extract_page_text(second, cache=cache)
+            prefixes = await _extract_page_text(
+                first, {"pages": [3]}, max_chars=6, cache=cache
+            )
+
+        assert [s["page"] for s in samples] == [1, 2]
+        assert len(samples[0]["textSample"]) <= 70
+        assert again == samples
+        assert text[2]["text"].startswith("Page 3 text")
+        assert len(text[0]["text"]) > 70
+        assert prefixes == [{"page": 3, "text": "Page 3"}]
+        # Samples only read 70-character prefixes; full text then had to
+        # read every page, after which shorter prefixes come from the cache
+        assert [(c.args[1], c.args[3]) for c in mock_read.await_args_list] == [
+            ([1, 2], 70),
+            ([1, 2, 3], None),
+        ]
+
+    async def test_document_hashed_once_until_file_changes(self, tmp_path):
+        """Test cache lookups reuse the file hash while the file is unchanged."""
+        doc_path = tmp_path / "a.pdf"
+        doc_path.write_bytes(b"%PDF bytes")
+        cache = DocumentCache()
+
+        async def read(_doc_path, page_nums, _workers=1, _max_chars=None):
+            return [f"Page {n}" for n in page_nums]
+
+        with patch.object(_mt, "pdf_page_count", return_value=2), patch.object(
+            _mt, "read_pages", AsyncMock(side_effect=read)
+        ), patch.object(
+            _mt, "calculate_file_hash", wraps=_mt.calculate_file_hash
+        ) as mock_hash:
+            await _extract_page_text(doc_path, cache=cache)
+            await _extract_page_text(doc_path, cache=cache)
+            assert mock_hash.call_count == 1
+
+            doc_path.write_bytes(b"%PDF changed bytes")
+            await _extract_page_text(doc_path, cache=cache)
+            assert mock_hash.call_count == 2
+
+    async def test_unreadable_page_keeps_the_other_pages(self, mock_pdf, tmp_path):
+        """Test a page that fails to read is skipped, not the whole document."""
+        page = mock_pdf.load_page.return_value
+        mock_pdf.__len__.return_value = 3
+
+        def load_page(index):
+            if index == 1:
+                raise RuntimeError("broken page")
+            return page
+
+        mock_pdf.load_page.side_effect = load_page
+        doc_path = tmp_path / "test.pdf"
+
+        samples = await _extract_page_samples(doc_path)
+        text = await _extract_page_text(doc_path, cache=DocumentCache())
+
+        assert [s["page"] for s in samples] == [1, 3]
+        assert text == [
+            {"page": 1, "text": "Sample text"},
+            {"page": 3, "text": "Sample text"},
+        ]
+
+    async def test_concurrent_first_reads_share_one_read(self, tmp_path):
+        """Test concurrent readers of an uncached document read it once."""
+        doc_path = tmp_path / "a.pdf"
+        doc_path.write_bytes(b"%PDF bytes")
+        cache = DocumentCache()
+
+        async def read(_doc_path, page_nums, *_args):
+            await asyncio.sleep(0.01)
+            return [f"Page {n}" for n in page_nums]
+
+        with patch.object(_mt, "pdf_page_count", return_value=2), patch.object(
+            _mt, "read_pages", AsyncMock(side_effect=read)
+        ) as mock_read:
+            results = await asyncio.gather(
+                *(_extract_page_text(doc_path, cache=cache) for _ in range(3))
+            )
+
+        assert mock_read.await_count == 1
+        expected = [{"page": 1, "text": "Page 1"}, {"page": 2, "text": "Page 2"}]
+        assert results == [expected] * 3
+
+
+class TestDocumentPath:
+    """Test suite for resolving document URLs to local files."""
+
+    async def test_concurrent_downloads_of_same_url_are_shared(self):
+        """Test concurrent handlers on one URL download it once."""
+
+        async def slow_download(_url):
+            await asyncio.sleep(0.01)
+            return Path("/tmp/docsray_doc.pdf")
+
+        with patch.object(
+            _mt, "download_document", AsyncMock(side_effect=slow_download)
+        ) as mock_download:
+            paths = await asyncio.gather(
+                *(_document_path("https://example.com/doc.pdf") for _ in range(3))
+            )
+            assert paths == [Path("/tmp/docsray_doc.pdf")] * 3
+            assert mock_download.await_count == 1
+
+            await _document_path("https://example.com/doc.pdf")
+            assert mock_download.await_count == 2
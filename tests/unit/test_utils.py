@@ -1,18 +1,32 @@
 """Tests for utility modules."""
 
 import asyncio
+import hashlib
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from docsray.utils import pdf_pages
 from docsray.utils.cache import DocumentCache
+from docsray.utils.coalescer import RequestCoalescer
 from docsray.utils.documents import (
     calculate_file_hash,
     get_document_format,
     is_url,
 )
 from docsray.utils.logging import setup_logging
+from docsray.utils.pdf_pages import (
+    close_documents,
+    page_count,
+    read_pages,
+    shutdown_pools,
+)
+from docsray.utils.rate_limiter import RateLimiter
+from docsray.utils.semantic_cache import SemanticCache
+from docsray.utils.text_cache import ExtractedTextCache
 
 
 class TestDocumentCache:
@@ -92,6 +106,313 @@ class TestDocumentCache:
         assert await cache.get("key2") is None
 
 
+class TestSemanticCache:
+    """Test SemanticCache functionality."""
+
+    def test_exact_hit_miss(self):
+        cache = SemanticCache()
+        key = cache.make_key("model", "prompt", "content", {"temperature": 0.0})
+
+        assert cache.get_exact(key) is None
+        cache.put(key, "response")
+        assert cache.get_exact(key) == "response"
+        assert key == cache.make_key("model", "prompt", "content", {"temperature": 0.0})
+        assert cache.make_key({"a": 1, "b": 2}) == cache.make_key({"b": 2, "a": 1})
+
+    def test_semantic_hit_above_threshold(self):
+        cache = SemanticCache(threshold=0.95)
+        cache.put("key1", "response", namespace="ns", embedding=[1.0, 0.0, 0.0])
+
+        assert cache.get("ns", [0.99, 0.05, 0.0]) == "response"
+        assert cache.get("ns", [0.0, 1.0, 0.0]) is None
+        assert cache.get("other-ns", [1.0, 0.0, 0.0]) is None
+
+    def test_eviction_drops_embeddings(self):
+        cache = SemanticCache(max_entries=1)
+        cache.put("key1", "first", namespace="ns", embedding=[1.0, 0.0])
+        cache.put("key2", "second", namespace="ns", embedding=[0.0, 1.0])
+
+        assert cache.get_exact("key1") is None
+        assert cache.get("ns", [1.0, 0.0]) is None
+        assert cache.get("ns", [0.0, 1.0]) == "second"
+
+
+    def test_put_same_key_replaces_embedding(self):
+        pytest.importorskip("numpy")
+        cache = SemanticCache()
+        cache.put("key1", "old", namespace="ns", embedding=[1.0, 0.0])
+        cache.put("key1", "new", namespace="ns", embedding=[0.0, 1.0])
+
+        assert cache._vectors["ns"].shape[0] == 1
+        assert cache.get("ns", [1.0, 0.0]) is None
+        assert cache.get("ns", [0.0, 1.0]) == "new"
+
+    def test_stats_count_exact_misses(self):
+        cache = SemanticCache()
+        cache.get_exact("missing")
+        cache.put("key1", "response")
+        cache.get_exact("key1")
+
+        assert cache.stats["exact_misses"] == 1
+        assert cache.stats["exact_hits"] == 1
+
+class TestExtractedTextCache:
+    """Test ExtractedTextCache functionality."""
+
+    def test_put_get(self, tmp_path):
+        cache = ExtractedTextCache(cache_dir=tmp_path)
+
+        assert cache.get("abc") is None
+        cache.put("abc", "extracted text")
+        assert cache.get("abc") == "extracted text"
+
+    def test_version_isolates_entries(self, tmp_path):
+        ExtractedTextCache(cache_dir=tmp_path, version="1").put("abc", "old")
+
+        assert ExtractedTextCache(cache_dir=tmp_path, version="2").get("abc") is None
+
+    def test_eviction_keeps_recent_entries(self, tmp_path):
+        import os
+
+        cache = ExtractedTextCache(cache_dir=tmp_path, max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        # Age entry "a" so it is the least recently used
+        os.utime(cache._entry_path("a"), (0, 0))
+        cache.put("c", "3")
+
+        assert cache.get("a") is None
+        assert cache.get("b") == "2"
+        assert cache.get("c") == "3"
+
+
+class TestRateLimiter:
+    """Test RateLimiter functionality."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_limiter_never_waits(self):
+        limiter = RateLimiter()
+
+        for _ in range(100):
+            await limiter.acquire(1000)
+        assert limiter.enabled is False
+
+    @pytest.mark.asyncio
+    async def test_request_limit_waits_for_window(self):
+        limiter = RateLimiter(requests_per_minute=2, window=0.1)
+
+        start = asyncio.get_running_loop().time()
+        for _ in range(3):
+            await limiter.acquire()
+
+        assert asyncio.get_running_loop().time() - start >= 0.09
+
+    def test_aimd_adjusts_request_limit(self):
+        limiter = RateLimiter(requests_per_minute=10)
+
+        limiter.on_rate_limited()
+        assert limiter.request_limit == 5
+        limiter.on_success()
+        assert limiter.request_limit == 6
+        for _ in range(10):
+            limiter.on_success()
+        assert limiter.request_limit == 10
+
+
+class TestRequestCoalescer:
+    """Test RequestCoalescer functionality."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submits_share_one_call(self):
+        calls = []
+
+        async def handler(key, items):
+            calls.append(list(items))
+            return [f"{key}:{item}" for item in items]
+
+        coalescer = RequestCoalescer(handler, window=0.01)
+        first, second = await asyncio.gather(
+            coalescer.submit("k", [1, 2]), coalescer.submit("k", [3])
+        )
+
+        assert calls == [[1, 2, 3]]
+        assert first == ["k:1", "k:2"]
+        assert second == ["k:3"]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_and_errors_propagate(self):
+        async def handler(_key, _items):
+            raise RuntimeError("boom")
+
+        coalescer = RequestCoalescer(handler, window=10, max_batch_size=2)
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(coalescer.submit("k", [1, 2]), timeout=1)
+
+
+    @pytest.mark.asyncio
+    async def test_result_count_mismatch_fails_every_waiter(self):
+        tasks_during_flush = []
+
+        async def handler(_key, items):
+            tasks_during_flush.append(len(coalescer._tasks))
+            return items[:1]
+
+        coalescer = RequestCoalescer(handler, window=0.01)
+        results = await asyncio.gather(
+            coalescer.submit("k", [1]),
+            coalescer.submit("k", [2]),
+            return_exceptions=True,
+        )
+
+        await asyncio.sleep(0)
+
+        # The running flush is referenced until it completes
+        assert tasks_during_flush == [1]
+        assert not coalescer._tasks
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_flush_cancels_every_waiter(self):
+        started = asyncio.Event()
+
+        async def handler(_key, items):
+            started.set()
+            await asyncio.Event().wait()
+            return items
+
+        coalescer = RequestCoalescer(handler, window=0.01)
+        waiters = [asyncio.ensure_future(coalescer.submit("k", [n])) for n in (1, 2)]
+        await asyncio.wait_for(started.wait(), timeout=1)
+        for task in list(coalescer._tasks):
+            task.cancel()
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*waiters, return_exceptions=True), timeout=1
+        )
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+
+
+class TestPdfPages:
+    """Test per-page PDF text reading."""
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        fitz = pytest.importorskip("fitz")
+        doc = fitz.open()
+        for i in range(1, 71):
+            doc.new_page().insert_text((72, 72), f"Page {i}")
+        path = tmp_path / "pages.pdf"
+        doc.save(path)
+        doc.close()
+        return path
+
+    @pytest.mark.asyncio
+    async def test_read_pages_in_requested_order(self, pdf_path):
+        assert page_count(pdf_path) == 70
+        texts = await read_pages(pdf_path, [3, 1], workers=1)
+        assert [t.strip() for t in texts] == ["Page 3", "Page 1"]
+
+        texts = await read_pages(pdf_path, [12], max_chars=4)
+        assert texts == ["Page"]
+
+    @pytest.mark.asyncio
+    async def test_parallel_read_preserves_order(self, pdf_path):
+        pages = list(range(1, 71))
+        with ThreadPoolExecutor(max_workers=2) as pool, patch(
+            "docsray.utils.pdf_pages.os.cpu_count", return_value=4
+        ), patch("docsray.utils.pdf_pages._pool", return_value=pool) as get_pool:
+            texts = await read_pages(pdf_path, pages, workers=3)
+
+        get_pool.assert_called_once_with(3)
+        assert [t.strip() for t in texts] == [f"Page {i}" for i in pages]
+
+    def test_shutdown_pools_stops_cached_pools(self):
+        pool = pdf_pages._pool(2)
+        assert pdf_pages._pool(2) is pool
+
+        shutdown_pools()
+
+        assert not pdf_pages._pools
+        with pytest.raises(RuntimeError):
+            pool.submit(print)
+
+    @pytest.mark.asyncio
+    async def test_document_handle_reused_until_file_changes(self, pdf_path):
+        import fitz
+
+        close_documents()
+        with patch("docsray.utils.pdf_pages.fitz.open", wraps=fitz.open) as opened:
+            page_count(pdf_path)
+            await read_pages(pdf_path, [1, 2])
+            assert opened.call_count == 1
+
+            doc = fitz.Document()
+            doc.new_page().insert_text((72, 72), "Changed")
+            doc.save(pdf_path)
+            doc.close()
+            texts = await read_pages(pdf_path, [1])
+        close_documents()
+
+        assert opened.call_count == 2
+        assert texts[0].strip() == "Changed"
+
+
+    def test_handle_evicted_before_locking_is_reopened(self, pdf_path, tmp_path):
+        import fitz
+
+        other = tmp_path / "other.pdf"
+        doc = fitz.Document()
+        doc.new_page()
+        doc.save(other)
+        doc.close()
+
+        close_documents()
+        real_current_handle = pdf_pages._current_handle
+        calls = []
+
+        def evict_after_lookup(doc_path):
+            entry = real_current_handle(doc_path)
+            if not calls:
+                # Another thread opens a document and evicts this one in the
+                # gap between the lookup and the handle lock
+                real_current_handle(str(other))
+            calls.append(doc_path)
+            return entry
+
+        with patch.object(pdf_pages, "MAX_OPEN_DOCUMENTS", 1), patch.object(
+            pdf_pages, "_current_handle", side_effect=evict_after_lookup
+        ), pdf_pages.open_document(str(pdf_path)) as pdf:
+            assert not pdf.is_closed
+            assert len(pdf) == 70
+        close_documents()
+
+        assert len(calls) == 2
+
+    def test_concurrent_readers_never_see_closed_handles(self, pdf_path, tmp_path):
+        import fitz
+
+        paths = [str(pdf_path)]
+        for i in range(3):
+            path = tmp_path / f"doc{i}.pdf"
+            doc = fitz.Document()
+            doc.new_page()
+            doc.save(path)
+            doc.close()
+            paths.append(str(path))
+
+        def read(n):
+            with pdf_pages.open_document(paths[n % len(paths)]) as pdf:
+                return pdf.is_closed
+
+        close_documents()
+        with patch.object(pdf_pages, "MAX_OPEN_DOCUMENTS", 1), ThreadPoolExecutor(
+            max_workers=8
+        ) as pool:
+            closed = list(pool.map(read, range(400)))
+        close_documents()
+
+        assert not any(closed)
+
 class TestDocumentUtils:
     """Test document utility functions."""
     
@@ -126,6 +447,7 @@ class TestDocumentUtils:
             
             assert hash1 == hash2  # Same file, same hash
             assert len(hash1) == 64  # SHA-256 hex digest length
+            assert hash1 == hashlib.sha256(b"test content").hexdigest()
         finally:
             tmp_path.unlink()
 
@@ -8,6 +8,8 @@ This script demonstrates that the fix correctly handles both:
 Run this script to verify the fixes are working correctly.
 """
 
+import functools
+import io
 import sys
 
 sys.path.insert(0, "src")
@@ -17,97 +19,125 @@ from docsray.tools.mistral_tools import coerce_parameter
 
 
 # Valid Mistral AI model identifiers
-VALID_MISTRAL_MODELS = [
-    "pixtral-12b-2409",  # Vision model for OCR/documents
-    "mistral-large-latest",  # Text model for complex reasoning
-    "mistral-small-latest",  # Lightweight text model
-]
-
-
-def test_model_fix():
+VALID_MISTRAL_MODELS = frozenset(
+    {
+        "pixtral-12b-2409",  # Vision model for OCR/documents
+        "mistral-large-latest",  # Text model for complex reasoning
+        "mistral-small-latest",  # Lightweight text model
+    }
+)
+
+# Coercion cases: (description, input, expected_type, expected_output)
+COERCION_CASES = (
+    (
+        "Dict from JSON string",
+        '{"start": 1, "end": 5}',
+        dict,
+        {"start": 1, "end": 5},
+    ),
+    (
+        "List from JSON string",
+        '["income_statement", "balance_sheet"]',
+        list,
+        ["income_statement", "balance_sheet"],
+    ),
+    ("Already a dict", {"start": 1, "end": 5}, dict, {"start": 1, "end": 5}),
+    (
+        "Already a list",
+        ["income_statement", "balance_sheet"],
+        list,
+        ["income_statement", "balance_sheet"],
+    ),
+    ("None value", None, dict, None),
+    (
+        "Complex nested structure",
+        '{"fields": [{"name": "revenue", "type": "currency"}]}',
+        dict,
+        {"fields": [{"name": "revenue", "type": "currency"}]},
+    ),
+    ("List of numbers", "[1, 30, 31, 32]", list, [1, 30, 31, 32]),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _default_config() -> MistralOCRConfig:
+    """Build the default config once; it only reads defaults and env."""
+    return MistralOCRConfig()
+
+
+def test_model_fix(out=None):
     """Verify the default model is now valid."""
-    print("=" * 70)
-    print("TEST 1: Invalid Default Model Fix")
-    print("=" * 70)
+    out = out or sys.stdout
+    print("=" * 70, file=out)
+    print("TEST 1: Invalid Default Model Fix", file=out)
+    print("=" * 70, file=out)
 
     # Create config with defaults
-    config = MistralOCRConfig()
+    config = _default_config()
 
-    print(f"Default model: {config.model}")
-    print(f"Valid? {config.model in VALID_MISTRAL_MODELS}")
+    print(f"Default model: {config.model}", file=out)
+    print(f"Valid? {config.model in VALID_MISTRAL_MODELS}", file=out)
 
     # Verify it's not the old invalid model
     assert config.model != "mistral-ocr-latest", "Old invalid model still in use!"
     assert config.model == "pixtral-12b-2409", f"Unexpected model: {config.model}"
 
-    print("\n✅ Default model is now valid: pixtral-12b-2409")
-    print("   (Previously was invalid: mistral-ocr-latest)")
+    print("\n✅ Default model is now valid: pixtral-12b-2409", file=out)
+    print("   (Previously was invalid: mistral-ocr-latest)", file=out)
     return True
 
 
-def test_parameter_coercion():
+def test_parameter_coercion(out=None):
     """Verify parameter coercion handles stringified JSON."""
-    print("\n" + "=" * 70)
-    print("TEST 2: Parameter Type Coercion Fix")
-    print("=" * 70)
-
-    tests = [
-        # (description, input, expected_type, expected_output)
-        (
-            "Dict from JSON string",
-            '{"start": 1, "end": 5}',
-            dict,
-            {"start": 1, "end": 5},
-        ),
-        (
-            "List from JSON string",
-            '["income_statement", "balance_sheet"]',
-            list,
-            ["income_statement", "balance_sheet"],
-        ),
-        ("Already a dict", {"start": 1, "end": 5}, dict, {"start": 1, "end": 5}),
-        (
-            "Already a list",
-            ["income_statement", "balance_sheet"],
-            list,
-            ["income_statement", "balance_sheet"],
-        ),
-        ("None value", None, dict, None),
-        (
-            "Complex nested structure",
-            '{"fields": [{"name": "revenue", "type": "currency"}]}',
-            dict,
-            {"fields": [{"name": "revenue", "type": "currency"}]},
-        ),
-        ("List of numbers", "[1, 30, 31, 32]", list, [1, 30, 31, 32]),
-    ]
+    out = out or sys.stdout
+    print("\n" + "=" * 70, file=out)
+    print("TEST 2: Parameter Type Coercion Fix", file=out)
+    print("=" * 70, file=out)
 
-    all_passed = True
-    for desc, input_val, expected_type, expected_output in tests:
+    def coerce(input_val, expected_type):
         try:
-            result = coerce_parameter(input_val, expected_type)
-            if result == expected_output:
-                print(f"✅ {desc}")
-                print(f"   Input:  {repr(input_val)[:60]}")
-                print(f"   Output: {repr(result)[:60]}")
-            else:
-                print(f"❌ {desc}")
-                print(f"   Expected: {expected_output}")
-                print(f"   Got:      {result}")
-                all_passed = False
+            return coerce_parameter(input_val, expected_type), None
         except Exception as e:
-            print(f"❌ {desc}")
-            print(f"   Error: {e}")
+            return None, e
+
+    results = [
+        coerce(input_val, expected_type)
+        for _, input_val, expected_type, _ in COERCION_CASES
+    ]
+
+    # Format everything first and write the report in one go
+    all_passed = True
+    lines = []
+    for (desc, input_val, _, expected_output), (result, error) in zip(
+        COERCION_CASES, results
+    ):
+        if error is not None:
+            lines += [f"❌ {desc}", f"   Error: {error}"]
             all_passed = False
+        elif result == expected_output:
+            lines += [
+                f"✅ {desc}",
+                f"   Input:  {repr(input_val)[:60]}",
+                f"   Output: {repr(result)[:60]}",
+            ]
+        else:
+            lines += [
+                f"❌ {desc}",
+                f"   Expected: {expected_output}",
+                f"   Got:      {result}",
+            ]
+            all_passed = False
+    out.write("\n".join(lines) + "\n")
 
     return all_passed
 
 
-def test_invalid_json_handling():
+def test_invalid_json_handling(out=None):
     """Verify graceful handling of invalid JSON."""
-    print("\n" + "=" * 70)
-    print("TEST 3: Invalid JSON Handling")
-    print("=" * 70)
+    out = out or sys.stdout
+    print("\n" + "=" * 70, file=out)
+    print("TEST 3: Invalid JSON Handling", file=out)
+    print("=" * 70, file=out)
 
     invalid_inputs = [
         "{invalid json}",
@@ -122,11 +152,14 @@ def test_invalid_json_handling():
             result = coerce_parameter(invalid_input, dict)
             # Should return the original value when parsing fails
             if result == invalid_input:
-                print(f"✅ Gracefully handled: {repr(invalid_input)[:40]}")
+                print(f"✅ Gracefully handled: {repr(invalid_input)[:40]}", file=out)
             else:
-                print(f"⚠️  Unexpected result for {repr(invalid_input)[:40]}: {result}")
+                print(
+                    f"⚠️  Unexpected result for {repr(invalid_input)[:40]}: {result}",
+                    file=out,
+                )
         except Exception as e:
-            print(f"❌ Exception for {repr(invalid_input)[:40]}: {e}")
+            print(f"❌ Exception for {repr(invalid_input)[:40]}: {e}", file=out)
             all_passed = False
 
     return all_passed
@@ -134,51 +167,54 @@ def test_invalid_json_handling():
 
 def main():
     """Run all verification tests."""
-    print("\n" + "=" * 70)
-    print("MISTRAL PARAMETER HANDLING FIX VERIFICATION")
-    print("=" * 70)
-    print("\nThis script verifies the fixes for Issue #23:")
-    print("1. Invalid default model (mistral-ocr-latest → pixtral-12b-2409)")
-    print("2. Parameter type coercion (stringified JSON → native types)")
-    print()
+    # Buffer the whole report and write it once at the end
+    out = io.StringIO()
+    print("\n" + "=" * 70, file=out)
+    print("MISTRAL PARAMETER HANDLING FIX VERIFICATION", file=out)
+    print("=" * 70, file=out)
+    print("\nThis script verifies the fixes for Issue #23:", file=out)
+    print("1. Invalid default model (mistral-ocr-latest → pixtral-12b-2409)", file=out)
+    print("2. Parameter type coercion (stringified JSON → native types)", file=out)
+    print(file=out)
 
     results = []
 
     try:
-        results.append(("Model Fix", test_model_fix()))
+        results.append(("Model Fix", test_model_fix(out)))
     except Exception as e:
-        print(f"\n❌ Model fix test failed: {e}")
+        print(f"\n❌ Model fix test failed: {e}", file=out)
         results.append(("Model Fix", False))
 
     try:
-        results.append(("Parameter Coercion", test_parameter_coercion()))
+        results.append(("Parameter Coercion", test_parameter_coercion(out)))
     except Exception as e:
-        print(f"\n❌ Parameter coercion test failed: {e}")
+        print(f"\n❌ Parameter coercion test failed: {e}", file=out)
         results.append(("Parameter Coercion", False))
 
     try:
-        results.append(("Invalid JSON Handling", test_invalid_json_handling()))
+        results.append(("Invalid JSON Handling", test_invalid_json_handling(out)))
     except Exception as e:
-        print(f"\n❌ Invalid JSON handling test failed: {e}")
+        print(f"\n❌ Invalid JSON handling test failed: {e}", file=out)
         results.append(("Invalid JSON Handling", False))
 
     # Summary
-    print("\n" + "=" * 70)
-    print("SUMMARY")
-    print("=" * 70)
+    print("\n" + "=" * 70, file=out)
+    print("SUMMARY", file=out)
+    print("=" * 70, file=out)
 
     all_passed = all(result for _, result in results)
 
     for test_name, passed in results:
         status = "✅ PASSED" if passed else "❌ FAILED"
-        print(f"{status}: {test_name}")
+        print(f"{status}: {test_name}", file=out)
 
     if all_passed:
-        print("\n🎉 All tests passed! The fix is working correctly.")
-        return 0
+        print("\n🎉 All tests passed! The fix is working correctly.", file=out)
     else:
-        print("\n⚠️  Some tests failed. Please review the output above.")
-        return 1
+        print("\n⚠️  Some tests failed. Please review the output above.", file=out)
+
+    sys.stdout.write(out.getvalue())
+    return 0 if all_passed else 1
 
 
 if __name__ == "__main__":